@@ -0,0 +1,242 @@
+import asyncio
+import time
+
+import aiohttp
+
+from _cache import ResponseCache
+from _errors import *
+from _http import BASE_LINK, _back_off, _decode, _http_error
+from _instrumentation import RequestRecord, _objects
+from _rate_limit import RetryPolicy
+from _single_flight import AsyncSingleFlight
+
+
+# The asyncio counterpart of `HTTPClient`, backed by one aiohttp connection pool.
+#
+# The aiohttp session is created on first use so the client can be built
+# outside of a running event loop. With an `instrument`, the session also
+# traces DNS lookups and new connections for the request records.
+class AsyncHTTPClient:
+    def __init__(self, auth_info, base_link = BASE_LINK, pool_size = 100, timeout = None, headers = None,
+        rate_limiter = None, retry_policy = None, cache = None, instrument = None, coalesce = True):
+        self.auth_info = auth_info
+        self.base_link = base_link
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = headers
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.instrument = instrument
+        self.flights = AsyncSingleFlight() if coalesce else None
+        self.session = None
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            # Mirror requests' timeout semantics: a number bounds the whole
+            # call, a `(connect, read)` tuple bounds each phase.
+            if isinstance(self.timeout, tuple):
+                timeout = aiohttp.ClientTimeout(total = None, sock_connect = self.timeout[0], sock_read = self.timeout[1])
+            else:
+                timeout = aiohttp.ClientTimeout(total = self.timeout)
+
+            self.session = aiohttp.ClientSession(
+                auth = aiohttp.BasicAuth(*self.auth_info),
+                connector = aiohttp.TCPConnector(limit = self.pool_size),
+                timeout = timeout,
+                headers = self.headers,
+                trace_configs = [_trace_config()] if self.instrument is not None else None
+            )
+        return self.session
+
+    # See `HTTPClient.request`.
+    async def request(self, method, path, params = None, invalidates = (), hydrate = None):
+        if self.instrument is not None:
+            return await self._instrumented(method, path, params, invalidates, hydrate)
+
+        payload = await self._request(method, path, params, invalidates)
+        return payload if hydrate is None else hydrate(payload)
+
+    async def _request(self, method, path, params, invalidates, record = None):
+        params = _stringify(params)
+
+        if not method == 'GET':
+            try:
+                return _decode((await self._send(method, path, params, record = record))[2], record)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(path, *invalidates)
+                if self.flights is not None:
+                    self.flights.forget()
+
+        if self.flights is None:
+            return await self._get(path, params, record)
+
+        payload, shared = await self.flights.do(ResponseCache.key(path, params), lambda: self._get(path, params, record))
+        if shared and record is not None:
+            record.coalesced = True
+            record.status = 200
+        return payload
+
+    # See `HTTPClient._get`.
+    async def _get(self, path, params, record):
+        if self.cache is None:
+            return _decode((await self._send('GET', path, params, record = record))[2], record)
+
+        key = self.cache.key(path, params)
+        generation = self.cache.generation(key)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh():
+            if record is not None:
+                record.cached = True
+                record.status = 200
+            return entry.payload
+
+        status, headers, body = await self._send('GET', path, params, entry.conditional_headers() if entry else None, record = record)
+        if status == 304:
+            if record is not None:
+                record.cached = True
+            self.cache.refresh(key, entry, generation)
+            return entry.payload
+
+        payload = _decode(body, record)
+        self.cache.store(key, payload, len(body), headers.get('ETag'), headers.get('Last-Modified'), generation)
+        return payload
+
+    # See `HTTPClient.stream`.
+    async def stream(self, method, path, params = None, chunk_size = 64 * 1024, hydrate = None):
+        params = _stringify(params)
+
+        if self.instrument is not None:
+            async for item in self._instrumented_stream(method, path, params, chunk_size, hydrate):
+                yield item
+            return
+
+        async with await self._send(method, path, params, stream = True) as req:
+            async for chunk in req.content.iter_chunked(chunk_size):
+                if hydrate is None:
+                    yield chunk
+                else:
+                    for item in hydrate(chunk):
+                        yield item
+
+    # See `HTTPClient._instrumented_stream`.
+    async def _instrumented_stream(self, method, path, params, chunk_size, hydrate):
+        record = RequestRecord(method, path)
+        record.dns = 0.0
+        started = time.perf_counter()
+        paused = 0.0
+        try:
+            async with await self._send(method, path, params, stream = True, record = record) as req:
+                async for chunk in req.content.iter_chunked(chunk_size):
+                    record.bytes += len(chunk)
+                    if hydrate is None:
+                        items = (chunk,)
+                    else:
+                        hydrating = time.perf_counter()
+                        items = hydrate(chunk)
+                        record.hydrate += time.perf_counter() - hydrating
+                        record.objects += len(items)
+
+                    for item in items:
+                        yielded = time.perf_counter()
+                        yield item
+                        paused += time.perf_counter() - yielded
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.total = time.perf_counter() - started - paused
+            self.instrument(record)
+
+    # See `HTTPClient._instrumented`.
+    async def _instrumented(self, method, path, params, invalidates, hydrate):
+        record = RequestRecord(method, path)
+        record.dns = 0.0
+        started = time.perf_counter()
+        try:
+            payload = await self._request(method, path, params, invalidates, record)
+            if hydrate is not None:
+                hydrating = time.perf_counter()
+                payload = hydrate(payload)
+                record.hydrate = time.perf_counter() - hydrating
+                record.objects = _objects(payload)
+            return payload
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.total = time.perf_counter() - started
+            self.instrument(record)
+
+    # Sends one request through the rate limiter, retrying it as `retry_policy` allows.
+    # Returns the status, headers and body of the response, or the still open
+    # response itself when streaming.
+    async def _send(self, method, path, params, headers = None, stream = False, record = None):
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                await asyncio.sleep(self.rate_limiter.reserve())
+
+            if record is None:
+                req = await self._get_session().request(method, self.base_link + path, params = params, headers = headers)
+            else:
+                sent = time.perf_counter()
+                req = await self._get_session().request(method, self.base_link + path, params = params, headers = headers,
+                    trace_request_ctx = record)
+                record.attempts += 1
+                record.status = req.status
+                record.ttfb = time.perf_counter() - sent
+            if stream and req.status == 200:
+                return req
+
+            async with req:
+                body = await req.read()
+
+            if req.status == 200 or (headers and req.status == 304):
+                return req.status, req.headers, body
+
+            delay = self.retry_policy.next_delay(req.status, req.headers.get('Retry-After'), attempt, started, method)
+            if delay is None:
+                raise _http_error(req.status, body)
+
+            _back_off(self.rate_limiter, req.status, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+# aiohttp only accepts string values. Lists of pairs (repeated keys) stay lists.
+def _stringify(params):
+    if not params:
+        return params
+    if isinstance(params, dict):
+        return {i: str(j) for i, j in params.items()}
+    return [(i, str(j)) for i, j in params]
+
+# Adds the time spent resolving hosts and opening connections to the
+# `RequestRecord` passed as the request's `trace_request_ctx`. DNS lookups
+# happen while a connection is being opened, so each phase keeps its own start.
+def _trace_config():
+    def timer(name):
+        async def start(session, context, params):
+            setattr(context, name, time.perf_counter())
+
+        async def end(session, context, params):
+            record = context.trace_request_ctx
+            if isinstance(record, RequestRecord):
+                setattr(record, name, getattr(record, name) + time.perf_counter() - getattr(context, name))
+
+        return start, end
+
+    trace_config = aiohttp.TraceConfig()
+    dns_start, dns_end = timer('dns')
+    trace_config.on_dns_resolvehost_start.append(dns_start)
+    trace_config.on_dns_resolvehost_end.append(dns_end)
+    connect_start, connect_end = timer('connect')
+    trace_config.on_connection_create_start.append(connect_start)
+    trace_config.on_connection_create_end.append(connect_end)
+    return trace_config
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# A cached, already decoded GET response.
+class _CacheEntry:
+    def __init__(self, payload, size, etag, last_modified, expires):
+        self.payload = payload
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    def fresh(self):
+        return time.monotonic() < self.expires
+
+    # Headers that let the server answer 304 if the resource has not changed.
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+# An opt-in LRU cache of decoded GET responses, keyed by path and params.
+#
+# Entries are served directly for `ttl` seconds. After that they are revalidated
+# with a conditional request, so an unchanged resource costs a 304 and no JSON
+# decode. The least recently used entries are evicted beyond `max_entries` or
+# `max_bytes` of response bodies. Any write to a tournament drops its entries.
+#
+# Every invalidation also moves its resources to a new generation. A GET reads
+# the generation of its resource before it is sent (`generation`) and passes
+# it to `store`/`refresh`, which skip responses that a write overtook while
+# they were in flight, as they may predate it.
+#
+# Cached payloads are shared between callers and must not be mutated.
+class ResponseCache:
+    def __init__(self, ttl = 30, max_entries = 256, max_bytes = 32 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(path, params):
+        if isinstance(params, dict):
+            params = params.items()
+        return (path, tuple(sorted(params or ())))
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    # The invalidation generation of the resource `key` belongs to.
+    def generation(self, key):
+        return self.generations.get(_resource(key[0]), 0)
+
+    def store(self, key, payload, size, etag = None, last_modified = None, generation = None):
+        entry = _CacheEntry(payload, size, etag, last_modified, time.monotonic() + self.ttl)
+        with self.lock:
+            if self._overtaken(key, generation):
+                return
+            self._remove(key)
+            self.entries[key] = entry
+            self.size += size
+
+            while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+                self._remove(next(iter(self.entries)))
+
+    # Marks an entry as fresh again after the server confirmed it with a 304.
+    def refresh(self, key, entry, generation = None):
+        with self.lock:
+            if self._overtaken(key, generation):
+                return
+            entry.expires = time.monotonic() + self.ttl
+            if key not in self.entries:
+                self.entries[key] = entry
+                self.size += entry.size
+            self.entries.move_to_end(key)
+
+    # Drops every entry for the resources the given API paths belong to,
+    # along with any cached tournament listing.
+    def invalidate(self, *paths):
+        resources = {_resource(i) for i in paths}
+        resources.add('tournaments')
+
+        with self.lock:
+            for resource in resources:
+                self.generations[resource] = self.generations.get(resource, 0) + 1
+            for key in [i for i in self.entries if _resource(i[0]) in resources]:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _overtaken(self, key, generation):
+        return generation is not None and not generation == self.generation(key)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+
+# "tournaments/123/matches.json" and "tournaments/123.json" both belong to "tournaments/123".
+def _resource(path):
+    return "/".join(path.split('.json')[0].split('/')[:2])
@@ -1,5 +1,14 @@
+import re
+import codecs
+import datetime
+import functools
+import json
+
 from aenum import MultiValueEnum
 
+from _enums import TournamentType, TournamentRankedBy, TournamentGrandFinalModifier, TournamentState, MatchState
+from _errors import *
+
 # Organizes parameters from pythonic syntax to what Challonge expects to see.
 def _prepare_params(improper_params, prefix = None):
     params = {}
@@ -15,9 +24,418 @@ def _prepare_params(improper_params, prefix = None):
         except:
             pass
 
+        if isinstance(j, datetime.datetime):
+            j = j.isoformat()
+
         if prefix:
             params[f"{prefix}[{i}]"] = j
         else:
             params[i] = j
 
     return params
+
+# Decodes a Challonge timestamp such as "2015-01-19T16:57:17.000-05:00". Empty values are returned unchanged.
+def _parse_datetime(value):
+    if not value:
+        return value
+    return _parse_timestamp(value)
+
+# `fromisoformat` reads Challonge's format directly and is far cheaper than
+# `strptime`. Every match of a bracket tends to share the same `created_at`, so
+# recently seen timestamps are memoized; datetimes are immutable and safe to share.
+@functools.lru_cache(maxsize = 4096)
+def _parse_timestamp(value):
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        split_date = value.split(':')
+        date_str = ":".join(split_date[:-1]) + split_date[-1]
+        return datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
+
+# Incrementally decodes a JSON array of objects as its bytes arrive, so each
+# element can be used as soon as it is complete instead of once the whole
+# body has been read.
+class _JSONArrayParser:
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.started = False
+        self.finished = False
+
+    # Takes the next chunk of the body and returns every element it completed.
+    def feed(self, chunk):
+        buffer = self.buffer + self.text.decode(chunk)
+        items = []
+        pos = 0
+
+        while not self.finished:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                break
+
+            if not self.started:
+                if not buffer[pos] == '[':
+                    raise ValueError('Expected a JSON array')
+                self.started = True
+                pos += 1
+            elif buffer[pos] == ']':
+                self.finished = True
+                pos += 1
+            else:
+                # An element cut off by the end of the chunk fails to decode
+                # and is retried once more of the body has arrived.
+                try:
+                    item, pos = self.decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break
+                items.append(item)
+
+        self.buffer = buffer[pos:]
+        return items
+
+    # Checks that the body ended with a complete array.
+    def close(self):
+        if not self.finished:
+            raise ValueError('Incomplete JSON array')
+
+# One parameter of a `Schema`, described by the checks it has to pass.
+#
+# `types` are the accepted types (bools are only accepted where `bool` is
+# listed), `enum` an enum the value is converted to, `max_length` and
+# `pattern` apply to strings, `minimum` and `maximum` to numbers, and
+# `round_to` rounds floats to that many decimals. `convert` runs first and
+# may turn other inputs into an accepted value.
+class Field:
+    def __init__(self, name, types = None, enum = None, max_length = None, pattern = None, pattern_message = None,
+        minimum = None, maximum = None, round_to = None, convert = None):
+        self.name = name
+        self.types = types
+        self.enum = enum
+        self.max_length = max_length
+        self.pattern = pattern
+        self.pattern_message = pattern_message
+        self.minimum = minimum
+        self.maximum = maximum
+        self.round_to = round_to
+        self.convert = convert
+
+    # Generates the function that checks and normalizes one value. Everything
+    # that does not depend on the value (regexes, enum lookups, error messages)
+    # is prepared here, once, and the checks are inlined into a single function.
+    def compile(self):
+        name = self.name
+        lines = []
+        constants = {"BadArgument": BadArgument}
+
+        def constant(key, value):
+            constants[key] = value
+            return key
+
+        if self.convert is not None:
+            lines.append(f"value = {constant('convert', self.convert)}(value)")
+
+        if self.enum is not None:
+            members = {i: i for i in self.enum}
+            members.update({j: i for i in self.enum for j in i.values})
+            message = f"Parameter `{name}` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(self.enum)])}"
+            lines += [
+                "try:",
+                f"    value = {constant('members', members)}[value]",
+                "except (KeyError, TypeError):",
+                f"    raise BadArgument({constant('enum', message)})"
+            ]
+
+        if self.types is not None:
+            message = f"Parameter `{name}` must be of type {' or '.join([i.__name__ for i in self.types])}"
+            condition = f"not isinstance(value, {constant('types', self.types)})"
+            if bool not in self.types and any(issubclass(bool, i) for i in self.types):
+                condition += " or value.__class__ is bool"
+            lines += [f"if {condition}:", f"    raise BadArgument({constant('type', message)})"]
+
+        if self.max_length is not None:
+            message = f"Parameter `{name}` cannot be more than {self.max_length} characters"
+            lines += [f"if len(value) > {self.max_length!r}:", f"    raise BadArgument({constant('length', message)})"]
+
+        if self.pattern is not None:
+            message = f"Parameter `{name}` {self.pattern_message or 'is not in a valid format'}"
+            lines += [
+                f"if not {constant('pattern', re.compile(self.pattern).search)}(value):",
+                f"    raise BadArgument({constant('format', message)})"
+            ]
+
+        if self.minimum is not None or self.maximum is not None:
+            if self.minimum is not None and self.maximum is not None:
+                message = f"Parameter `{name}` must be between the values {self.minimum} and {self.maximum}"
+                condition = f"value < {self.minimum!r} or value > {self.maximum!r}"
+            elif self.minimum is not None:
+                message = f"Parameter `{name}` must be at least {self.minimum}"
+                condition = f"value < {self.minimum!r}"
+            else:
+                message = f"Parameter `{name}` must be at most {self.maximum}"
+                condition = f"value > {self.maximum!r}"
+            lines += [f"if {condition}:", f"    raise BadArgument({constant('range', message)})"]
+
+        if self.round_to is not None:
+            lines.append(f"value = round(float(value), {self.round_to!r})")
+
+        source = '\n'.join(["def validate(value):"] + [f"    {i}" for i in lines] + ["    return value"])
+        exec(source, constants)
+        return constants['validate']
+
+# The parameters of one kind of API payload, each compiled once into a
+# validator when the schema is created.
+#
+# `validate` takes the values as positional arguments in field order and/or as
+# keyword arguments, skips None, and returns a dict of the checked values.
+# `encode` also turns them into request parameters under `prefix`. The `_many`
+# variants check a whole batch of payload dicts, raising a single
+# `BadArgument` that lists every invalid payload.
+class Schema:
+    def __init__(self, *fields, prefix = None):
+        self.fields = fields
+        self.names = tuple(i.name for i in fields)
+        self.prefix = prefix
+        self.validators = {i.name: i.compile() for i in fields}
+
+    def validate(self, *args, **kwargs):
+        if args:
+            if len(args) > len(self.names):
+                raise BadArgument(f"Expected at most {len(self.names)} settings, got {len(args)}")
+            kwargs.update(zip(self.names, args))
+        return self.check(kwargs)
+
+    # Validates a dict of values. `required` names must be present; `defaults` fill in missing ones.
+    def check(self, values, required = (), defaults = None):
+        data = {}
+        validators = self.validators
+        for i, j in values.items():
+            if j is not None:
+                try:
+                    validator = validators[i]
+                except KeyError:
+                    raise BadArgument(f"Unknown setting `{i}`, valid settings: {', '.join(['`{}`'.format(i) for i in self.names])}")
+                data[i] = validator(j)
+
+        for i in required:
+            if i not in data:
+                raise BadArgument(f"Parameter `{i}` is required")
+        if defaults:
+            for i, j in defaults.items():
+                data.setdefault(i, j)
+        return data
+
+    def encode(self, *args, **kwargs):
+        return _prepare_params(self.validate(*args, **kwargs), self.prefix)
+
+    def validate_many(self, payloads, required = (), defaults = None):
+        data = []
+        errors = []
+        for index, payload in enumerate(payloads):
+            try:
+                if not isinstance(payload, dict):
+                    raise BadArgument('Every payload must be a dict of settings')
+                data.append(self.check(payload, required, defaults))
+            except BadArgument as e:
+                errors.append(f"payloads[{index}]: {e}")
+
+        if errors:
+            raise BadArgument('\n'.join(errors))
+        return data
+
+    def encode_many(self, payloads, required = (), defaults = None):
+        return [_prepare_params(i, self.prefix) for i in self.validate_many(payloads, required, defaults)]
+
+def _float_or_int(name):
+    return Field(name, types = (int, float), round_to = 1)
+
+def _start_at(value):
+    if isinstance(value, str):
+        try:
+            return _parse_timestamp(value)
+        except ValueError:
+            raise BadArgument('Parameter `start_at` must be a `datetime.datetime` object or an ISO 8601 string')
+    return value
+
+SUBDOMAIN = Field('subdomain', types = (str,), max_length = 60, pattern = '^[a-zA-Z0-9_]*$', pattern_message = 'can only be letters, numbers, and underscores')
+
+TOURNAMENT_SETTINGS = Schema(
+    Field('name', types = (str,), max_length = 60),
+    Field('url', types = (str,), max_length = 60, pattern = '^[a-zA-Z0-9_]*$', pattern_message = 'can only be letters, numbers, and underscores'),
+    Field('tournament_type', enum = TournamentType),
+    SUBDOMAIN,
+    Field('description', types = (str,)),
+    Field('open_signup', types = (bool,)),
+    Field('hold_third_place_match', types = (bool,)),
+    _float_or_int('pts_for_match_win'),
+    _float_or_int('pts_for_match_tie'),
+    _float_or_int('pts_for_game_win'),
+    _float_or_int('pts_for_game_tie'),
+    Field('swiss_rounds', types = (int,), minimum = 1),
+    _float_or_int('pts_for_bye'),
+    Field('ranked_by', enum = TournamentRankedBy),
+    _float_or_int('rr_pts_for_match_win'),
+    _float_or_int('rr_pts_for_match_tie'),
+    _float_or_int('rr_pts_for_game_win'),
+    _float_or_int('rr_pts_for_game_tie'),
+    Field('accept_attachments', types = (bool,)),
+    Field('hide_forum', types = (bool,)),
+    Field('show_rounds', types = (bool,)),
+    Field('private', types = (bool,)),
+    Field('notify_users_when_matches_open', types = (bool,)),
+    Field('notify_users_when_the_tournament_ends', types = (bool,)),
+    Field('sequential_pairings', types = (bool,)),
+    Field('signup_cap', types = (int,), minimum = 1, maximum = 256),
+    Field('start_at', types = (datetime.datetime,), convert = _start_at),
+    Field('check_in_duration', types = (int,), minimum = 1),
+    Field('grand_finals_modifier', enum = TournamentGrandFinalModifier),
+    prefix = 'tournament'
+)
+NEW_TOURNAMENT_REQUIRED = ('name', 'url')
+NEW_TOURNAMENT_DEFAULTS = {"tournament_type": TournamentType.single_elimination}
+
+# Validates the settings accepted by `Tournaments.create` and `Tournament.update`.
+def _tournament_settings(*args, **kwargs):
+    return TOURNAMENT_SETTINGS.validate(*args, **kwargs)
+
+# Validates the settings for `Tournaments.create`, where `name` and `url` are required.
+def _new_tournament_settings(*args, **kwargs):
+    kwargs.update(zip(TOURNAMENT_SETTINGS.names, args))
+    return TOURNAMENT_SETTINGS.check(kwargs, NEW_TOURNAMENT_REQUIRED, NEW_TOURNAMENT_DEFAULTS)
+
+# Validates and encodes the payloads of `Tournaments.create_many` in one pass.
+def _new_tournaments_params(payloads):
+    return TOURNAMENT_SETTINGS.encode_many(payloads, NEW_TOURNAMENT_REQUIRED, NEW_TOURNAMENT_DEFAULTS)
+
+# Accepts a `Match` or its ID.
+def _match_id(match_id):
+    # match.py builds on this module, so it is imported here.
+    from match import Match
+
+    if isinstance(match_id, Match):
+        return match_id.id
+    if not isinstance(match_id, int):
+        raise BadArgument('Parameter `match_id` must be of type int')
+    return match_id
+
+# Accepts a `Participant` or its ID.
+def _participant_id(participant_id):
+    # participant.py builds on this module, so it is imported here.
+    from participant import Participant
+
+    if isinstance(participant_id, Participant):
+        return participant_id.id
+    if not isinstance(participant_id, int):
+        raise BadArgument('Parameter `participant_id` must be of type int')
+    return participant_id
+
+# `created_after`/`created_before` are sent as `YYYY-MM-DD`.
+def _date_filter(name):
+    message = f"Parameter `{name}` must be a `datetime.datetime` object or a string in the format `YYYY-MM-DD`"
+
+    def convert(value):
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.strftime('%Y-%m-%d')
+        try:
+            datetime.datetime.strptime(value, '%Y-%m-%d')
+        except:
+            raise BadArgument(message)
+        return value
+    return convert
+
+TOURNAMENT_FILTERS = Schema(
+    Field('state', enum = TournamentState),
+    Field('tournament_type', enum = TournamentType),
+    Field('created_after', convert = _date_filter('created_after')),
+    Field('created_before', convert = _date_filter('created_before')),
+    SUBDOMAIN
+)
+
+# Validates the filters accepted by `Tournaments.get_all`.
+def _tournament_filters(*args, **kwargs):
+    data = TOURNAMENT_FILTERS.validate(*args, **kwargs)
+    if 'state' in data:
+        data['state'] = data['state'].name
+    if 'tournament_type' in data:
+        data['type'] = data.pop('tournament_type').name
+    return data
+
+MATCH_FILTERS = Schema(
+    Field('state', enum = MatchState),
+    Field('participant_id', convert = _participant_id)
+)
+
+# Validates a `MatchState` filter (a member or one of its values) with the
+# `state` field of `MATCH_FILTERS`.
+def _match_state(state):
+    return MATCH_FILTERS.validators['state'](state)
+
+# Validates the filters accepted by `Matches.get_all`.
+def _match_filters(*args, **kwargs):
+    data = MATCH_FILTERS.validate(*args, **kwargs)
+    if 'state' in data:
+        data['state'] = data['state'].name
+    return data
+
+def _scores_csv(value):
+    if isinstance(value, (list, tuple)):
+        try:
+            return ','.join([f"{int(i)}-{int(j)}" for i, j in value])
+        except:
+            raise BadArgument('Parameter `scores_csv` must be a str or a list of (player 1, player 2) score pairs')
+    return value
+
+def _winner_id(value):
+    return value if value == 'tie' else _participant_id(value)
+
+MATCH_SETTINGS = Schema(
+    Field('scores_csv', types = (str,), convert = _scores_csv, pattern = r'^-?\d+--?\d+(,-?\d+--?\d+)*$', pattern_message = 'must be in the format `3-1,2-3`'),
+    Field('winner_id', convert = _winner_id),
+    Field('player1_votes', types = (int,), minimum = 0),
+    Field('player2_votes', types = (int,), minimum = 0),
+    prefix = 'match'
+)
+
+# Validates the result accepted by `Match.update` and `Matches.report_many`.
+def _match_settings(*args, **kwargs):
+    return MATCH_SETTINGS.validate(*args, **kwargs)
+
+PARTICIPANT_FIELDS = (
+    Field('name', types = (str,)),
+    Field('email', types = (str,)),
+    Field('challonge_username', types = (str,)),
+    Field('seed', types = (int,), minimum = 1),
+    Field('misc', types = (str,), max_length = 255),
+    Field('invite_name_or_email', types = (str,))
+)
+PARTICIPANT_SETTINGS = Schema(*PARTICIPANT_FIELDS, prefix = 'participant')
+BULK_PARTICIPANT_SETTINGS = Schema(*[i for i in PARTICIPANT_FIELDS if i.name in ('name', 'invite_name_or_email', 'seed', 'misc')])
+
+# Validates the settings accepted by `Participants.create` and `Participants.update`.
+def _participant_settings(*args, **kwargs):
+    return PARTICIPANT_SETTINGS.validate(*args, **kwargs)
+
+# Encodes one batch of `Participants.bulk_add` as `participants[][...]` pairs.
+# Each entry is a name or a dict of `name`, `invite_name_or_email`, `seed` and
+# `misc`. Every entry needs a name: the API starts a new participant whenever a
+# key repeats, so `name` must open each one for the entries to stay apart.
+def _bulk_participant_params(participants):
+    payloads = [{"name": i} if isinstance(i, str) else i for i in participants]
+
+    params = []
+    for data in BULK_PARTICIPANT_SETTINGS.validate_many(payloads, required = ('name',)):
+        data = {"name": data.pop('name'), **data}
+        params.extend((f"participants[][{i}]", j) for i, j in _prepare_params(data).items())
+    return params
+
+# Counts passed to the batch helpers, each an int of at least 1.
+COUNTS = Schema(
+    Field('concurrency', types = (int,), minimum = 1),
+    Field('batch_size', types = (int,), minimum = 1),
+    Field('window_days', types = (int,), minimum = 1)
+)
+
+# Validates one of the `COUNTS`, e.g. `_count('concurrency', concurrency)`.
+def _count(name, value):
+    return COUNTS.validators[name](value)
@@ -7,9 +7,12 @@ class ChallongeException(Exception):
 
 class HTTPException(ChallongeException):
     """Exception whenever a request gets a response code other than 200: OK.
+
+    `status` holds the numeric response code when one is known.
     """
-    def __init__(self, code = None):
+    def __init__(self, code = None, status = None):
         super().__init__(f"Request failed with code: {code}" or "Request failed.")
+        self.status = status
 
 class UserInputError(ChallongeException):
     """Handler for all user input related errors.
@@ -0,0 +1,117 @@
+import datetime
+
+from _data_management import _parse_datetime, _parse_timestamp
+
+
+# A model attribute backed by a key of the object's raw API payload.
+#
+# The value is decoded the first time it is read and memoized in the
+# instance's `_values` dict, which also holds any value assigned locally.
+# Owners need `_raw` and `_values` slots.
+class LazyField:
+    __slots__ = ('name', 'key', 'decoder', 'decode')
+
+    def __init__(self, key, decoder = None):
+        self.name = key
+        self.key = key
+        self.decoder = decoder
+        self.decode = _EnumLookup(decoder).__getitem__ if _is_enum(decoder) else decoder
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        values = instance._values
+        try:
+            return values[self.name]
+        except KeyError:
+            pass
+
+        value = instance._raw.get(self.key)
+        if self.decode is not None:
+            value = self.decode(value)
+        values[self.name] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance._values[self.name] = value
+
+
+# A model's field spec is a list of (attribute, raw key, decoder) triples.
+# `compile_hydrator` and `compile_dehydrator` turn one into straight-line
+# functions, generated once per model, that read or write every field without
+# interpreting the spec again. Datetimes go through the memoized timestamp
+# decoder and enums through a precomputed value lookup, both inlined.
+
+# The field spec of a model built from `LazyField`s, in declaration order.
+def model_fields(cls):
+    fields = {}
+    for owner in reversed(cls.__mro__):
+        for field in vars(owner).values():
+            if isinstance(field, LazyField):
+                fields[field.name] = (field.name, field.key, field.decoder)
+    return list(fields.values())
+
+# Generates `hydrate(target, raw)`, which sets every attribute of `target`
+# from a raw payload. Missing keys decode as None.
+def compile_hydrator(fields):
+    namespace = {'parse_timestamp': _parse_timestamp}
+    lines = ["def hydrate(target, raw):", "    get = raw.get"]
+    for index, (name, key, decoder) in enumerate(fields):
+        value = f"get({key!r})"
+        if decoder is _parse_datetime:
+            lines.append(f"    value = {value}")
+            value = "value and parse_timestamp(value)"
+        elif _is_enum(decoder):
+            namespace[f"decode{index}"] = _EnumLookup(decoder)
+            value = f"decode{index}[{value}]"
+        elif decoder is not None:
+            namespace[f"decode{index}"] = decoder
+            value = f"decode{index}({value})"
+        lines.append(f"    target.{name} = {value}")
+
+    return _compile('hydrate', lines, namespace)
+
+# Generates `dehydrate(values, raw)`, the inverse of `hydrate`: the raw
+# payload of a model from its decoded `values`. Fields missing from `values`
+# (e.g. lazy fields never read) are copied from `raw` unchanged.
+def compile_dehydrator(fields):
+    namespace = {'missing': object(), 'datetime': datetime.datetime}
+    lines = ["def dehydrate(values, raw):", "    get = values.get"]
+    items = []
+    for index, (name, key, decoder) in enumerate(fields):
+        if decoder is None:
+            value = f"values[{name!r}] if {name!r} in values else raw.get({key!r})"
+        else:
+            if decoder is _parse_datetime:
+                encoded = f"v{index}.isoformat() if isinstance(v{index}, datetime) else v{index}"
+            elif _is_enum(decoder):
+                namespace[f"enum{index}"] = decoder
+                encoded = f"v{index}.value if isinstance(v{index}, enum{index}) else v{index}"
+            else:
+                encoded = f"v{index}"
+            lines.append(f"    v{index} = get({name!r}, missing)")
+            value = f"raw.get({key!r}) if v{index} is missing else {encoded}"
+        items.append(f"        {key!r}: {value},")
+
+    return _compile('dehydrate', lines + ["    return {"] + items + ["    }"], namespace)
+
+def _compile(name, lines, namespace):
+    exec('\n'.join(lines), namespace)
+    return namespace[name]
+
+def _is_enum(decoder):
+    return isinstance(decoder, type) and hasattr(decoder, '__members__')
+
+# Maps every value of an enum, including its aliases, to its member. Anything
+# else is left to the enum itself, so unknown values raise as they did before.
+class _EnumLookup(dict):
+    def __init__(self, enum):
+        super().__init__((value, member) for member in enum for value in getattr(member, 'values', (member.value,)))
+        self.enum = enum
+
+    def __missing__(self, value):
+        return self.enum(value)
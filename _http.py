@@ -0,0 +1,271 @@
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from _errors import *
+from _cache import ResponseCache
+from _instrumentation import RequestRecord, _objects
+from _rate_limit import RetryPolicy
+from _single_flight import SingleFlight
+
+
+BASE_LINK = "https://api.challonge.com/v1/"
+
+
+# Owns the keep-alive connection pool shared by every object created from one
+# Challonge client, so consecutive calls reuse open TCP/TLS connections.
+#
+# Every request first takes a token from `rate_limiter` (a `TokenBucket`, if
+# given) and failed requests are retried according to `retry_policy`. GET
+# responses are kept in `cache` (a `ResponseCache`, if given).
+#
+# With `coalesce`, identical GETs made while one is already in flight wait for
+# it and share its response instead of sending their own.
+#
+# When `instrument` is set, it is called with a `RequestRecord` after every
+# request. Otherwise requests take the same path as if it did not exist.
+class HTTPClient:
+    def __init__(self, auth_info, base_link = BASE_LINK, pool_size = 10, timeout = None, headers = None,
+        rate_limiter = None, retry_policy = None, cache = None, instrument = None, coalesce = True):
+        self.auth_info = auth_info
+        self.base_link = base_link
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.instrument = instrument
+        self.flights = SingleFlight() if coalesce else None
+
+        self.session = requests.Session()
+        self.session.auth = auth_info
+        if headers:
+            self.session.headers.update(headers)
+
+        adapter = _TimedAdapter(pool_connections = pool_size, pool_maxsize = pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    # Sends a request relative to the API base link and returns the decoded JSON body.
+    # `params` is a dict, or a list of pairs when a key repeats.
+    #
+    # GETs are served from `cache` when one is configured; any other method drops
+    # the cached responses for its resource and for the extra `invalidates` paths.
+    #
+    # `hydrate`, if given, builds the models from the decoded payload and its
+    # result is returned instead, so the time it takes is part of the request's record.
+    def request(self, method, path, params = None, invalidates = (), hydrate = None):
+        if self.instrument is not None:
+            return self._instrumented(method, path, params, invalidates, hydrate)
+
+        payload = self._request(method, path, params, invalidates)
+        return payload if hydrate is None else hydrate(payload)
+
+    def _request(self, method, path, params, invalidates, record = None):
+        if not method == 'GET':
+            try:
+                return _decode(self._send(method, path, params, record = record).content, record)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(path, *invalidates)
+                if self.flights is not None:
+                    self.flights.forget()
+
+        if self.flights is None:
+            return self._get(path, params, record)
+
+        payload, shared = self.flights.do(ResponseCache.key(path, params), lambda: self._get(path, params, record))
+        if shared and record is not None:
+            record.coalesced = True
+            record.status = 200
+        return payload
+
+    # A GET, served from the cache when possible.
+    def _get(self, path, params, record):
+        if self.cache is None:
+            return _decode(self._send('GET', path, params, record = record).content, record)
+
+        key = self.cache.key(path, params)
+        generation = self.cache.generation(key)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh():
+            if record is not None:
+                record.cached = True
+                record.status = 200
+            return entry.payload
+
+        req = self._send('GET', path, params, entry.conditional_headers() if entry else None, record = record)
+        if req.status_code == 304:
+            if record is not None:
+                record.cached = True
+            self.cache.refresh(key, entry, generation)
+            return entry.payload
+
+        payload = _decode(req.content, record)
+        self.cache.store(key, payload, len(req.content), req.headers.get('ETag'), req.headers.get('Last-Modified'), generation)
+        return payload
+
+    # Sends a request and yields its body in chunks as they arrive, without
+    # buffering the whole response. Streams bypass the cache.
+    #
+    # `hydrate`, if given, is called with every chunk and returns a list of the
+    # models completed by it, which are yielded instead of the chunks.
+    def stream(self, method, path, params = None, chunk_size = 64 * 1024, hydrate = None):
+        if self.instrument is not None:
+            yield from self._instrumented_stream(method, path, params, chunk_size, hydrate)
+            return
+
+        with self._send(method, path, params, stream = True) as req:
+            if hydrate is None:
+                yield from req.iter_content(chunk_size)
+                return
+            for chunk in req.iter_content(chunk_size):
+                yield from hydrate(chunk)
+
+    # See `_instrumented`. `bytes` counts the body as it streams and `hydrate`
+    # the time spent in `hydrate`, incremental JSON parsing included. Time the
+    # caller spends between two items is left out of `total`.
+    def _instrumented_stream(self, method, path, params, chunk_size, hydrate):
+        record = RequestRecord(method, path)
+        _connections.time = 0.0
+        started = time.perf_counter()
+        paused = 0.0
+        req = None
+        try:
+            # The caller may make other requests between items, so the
+            # connection time of this one is read before the first of them.
+            req = self._send(method, path, params, stream = True, record = record)
+            record.connect = _connections.time
+            with req:
+                for chunk in req.iter_content(chunk_size):
+                    record.bytes += len(chunk)
+                    if hydrate is None:
+                        items = (chunk,)
+                    else:
+                        hydrating = time.perf_counter()
+                        items = hydrate(chunk)
+                        record.hydrate += time.perf_counter() - hydrating
+                        record.objects += len(items)
+
+                    for item in items:
+                        yielded = time.perf_counter()
+                        yield item
+                        paused += time.perf_counter() - yielded
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.total = time.perf_counter() - started - paused
+            if req is None:
+                record.connect = _connections.time
+            self.instrument(record)
+
+    def _instrumented(self, method, path, params, invalidates, hydrate):
+        record = RequestRecord(method, path)
+        _connections.time = 0.0
+        started = time.perf_counter()
+        try:
+            payload = self._request(method, path, params, invalidates, record)
+            if hydrate is not None:
+                hydrating = time.perf_counter()
+                payload = hydrate(payload)
+                record.hydrate = time.perf_counter() - hydrating
+                record.objects = _objects(payload)
+            return payload
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.total = time.perf_counter() - started
+            record.connect = _connections.time
+            self.instrument(record)
+
+    # Sends one request through the rate limiter, retrying it as `retry_policy` allows.
+    def _send(self, method, path, params, headers = None, stream = False, record = None):
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                time.sleep(self.rate_limiter.reserve())
+
+            req = self.session.request(method, self.base_link + path, params = params, headers = headers, timeout = self.timeout, stream = stream)
+            if record is not None:
+                record.attempts += 1
+                record.status = req.status_code
+                record.ttfb = req.elapsed.total_seconds()
+            if req.status_code == 200 or (headers and req.status_code == 304):
+                return req
+
+            delay = self.retry_policy.next_delay(req.status_code, req.headers.get('Retry-After'), attempt, started, method)
+            if delay is None:
+                raise _http_error(req.status_code, req.content)
+
+            _back_off(self.rate_limiter, req.status_code, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self.session.close()
+
+
+def _decode(body, record = None):
+    if not body:
+        return None
+    if record is None:
+        return json.loads(body)
+
+    started = time.perf_counter()
+    payload = json.loads(body)
+    record.decode = time.perf_counter() - started
+    record.bytes = len(body)
+    return payload
+
+# A 429 means the whole account is over quota, so hold back every other
+# request sharing the rate limiter for the same delay.
+def _back_off(rate_limiter, status_code, delay):
+    if rate_limiter and status_code == 429:
+        rate_limiter.pause(delay)
+
+# Builds an HTTPException from a failed response, including Challonge's
+# own error message when the body carries one.
+def _http_error(status_code, body):
+    try:
+        errors = json.loads(body)
+        return HTTPException(f"{status_code} - {errors['errors'][0]}", status_code)
+    except:
+        return HTTPException(status_code, status_code)
+
+
+# Seconds the current thread has spent opening connections since the last
+# reset. Only read for instrumented requests; pooled connections cost nothing.
+_connections = threading.local()
+
+class _TimedConnection:
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connections.time = getattr(_connections, 'time', 0.0) + time.perf_counter() - started
+
+class _TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+# An `HTTPAdapter` whose connections record how long they took to open.
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool, 'https': _TimedHTTPSConnectionPool}
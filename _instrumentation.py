@@ -0,0 +1,166 @@
+import functools
+import math
+import re
+import threading
+
+
+# Everything measured about one call to the API, passed to the `instrument`
+# hook of a client once the call is over.
+#
+# Times are in seconds. `ttfb` runs from sending the last attempt to its
+# response headers and `connect` sums the time spent opening new connections
+# (DNS included; 0 when pooled connections were reused). `dns` is measured on
+# its own by the asyncio client only. `decode` is the JSON decoding of the body
+# and `hydrate` the building of the `objects` models from it. `total` covers
+# the whole call, including rate limiting, retries and hydration. `cached` is
+# set when the response came from the `ResponseCache`, `coalesced` when it was
+# shared from an identical request already in flight, and `error` holds the
+# class name of the exception the call raised, if any.
+class RequestRecord:
+    __slots__ = ('method', 'path', 'endpoint', 'status', 'attempts', 'dns', 'connect', 'ttfb', 'total', 'bytes',
+        'decode', 'hydrate', 'objects', 'cached', 'coalesced', 'error')
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.endpoint = _endpoint(path)
+        self.status = None
+        self.attempts = 0
+        self.dns = None
+        self.connect = 0.0
+        self.ttfb = None
+        self.total = None
+        self.bytes = 0
+        self.decode = 0.0
+        self.hydrate = 0.0
+        self.objects = 0
+        self.cached = False
+        self.coalesced = False
+        self.error = None
+
+    def __repr__(self):
+        return f"<RequestRecord {self.method} {self.endpoint} status={self.status} total={self.total}>"
+
+
+# Collects `RequestRecord`s in process, per method and endpoint. Pass an
+# instance as the `instrument` of a client.
+#
+# Durations are kept in log-scale histograms (buckets 10% wide between 1µs
+# and about 10 hours), so memory stays constant however many requests are made
+# and percentiles are accurate to within a bucket.
+class RequestStats:
+    TIMINGS = ('total', 'ttfb', 'connect', 'decode', 'hydrate')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def __call__(self, record):
+        with self.lock:
+            stats = self.endpoints.get((record.method, record.endpoint))
+            if stats is None:
+                stats = self.endpoints[(record.method, record.endpoint)] = _EndpointStats()
+            stats.add(record)
+
+    # A dict from (method, endpoint) to its counters and, for every timing in
+    # `TIMINGS`, its mean, p50, p90, p99 and max.
+    def summary(self):
+        with self.lock:
+            return {i: j.summary() for i, j in self.endpoints.items()}
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.cached = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.bytes = 0
+        self.objects = 0
+        self.statuses = {}
+        self.timings = {i: Histogram() for i in RequestStats.TIMINGS}
+
+    def add(self, record):
+        self.count += 1
+        self.errors += record.error is not None
+        self.cached += record.cached
+        self.coalesced += record.coalesced
+        self.retries += max(0, record.attempts - 1)
+        self.bytes += record.bytes
+        self.objects += record.objects
+        self.statuses[record.status] = self.statuses.get(record.status, 0) + 1
+        for name, histogram in self.timings.items():
+            value = getattr(record, name)
+            if value is not None:
+                histogram.add(value)
+
+    def summary(self):
+        summary = {
+            'count': self.count, 'errors': self.errors, 'cached': self.cached, 'coalesced': self.coalesced, 'retries': self.retries,
+            'bytes': self.bytes, 'objects': self.objects, 'statuses': dict(self.statuses)
+        }
+        for name, histogram in self.timings.items():
+            summary[name] = {
+                'mean': histogram.mean(), 'p50': histogram.percentile(0.5), 'p90': histogram.percentile(0.9),
+                'p99': histogram.percentile(0.99), 'max': histogram.max
+            }
+        return summary
+
+
+# A histogram of durations in log-scale buckets.
+class Histogram:
+    MINIMUM = 1e-6
+    GROWTH = 1.1
+    BUCKETS = 256
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        index = 0 if value <= self.MINIMUM else min(self.BUCKETS - 1, 1 + int(math.log(value / self.MINIMUM, self.GROWTH)))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    # The upper bound of the bucket holding the `fraction` quantile, capped at the largest value seen.
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.max, self.MINIMUM * self.GROWTH ** index)
+        return self.max
+
+
+# The endpoint template of an API path, e.g. "tournaments/{id}/matches/{id}.json".
+# Tournaments are addressed by ID or url; matches and participants by numeric ID.
+@functools.lru_cache(maxsize = 1024)
+def _endpoint(path):
+    return _IDENTIFIER.sub('{id}', path)
+
+_IDENTIFIER = re.compile(r'(?<=^tournaments/)[^/]+?(?=\.json$|/)|(?<=/matches/)\d+|(?<=/participants/)\d+')
+
+# How many models a call built: each item of a list, plus the matches and
+# participants included with a tournament.
+def _objects(result):
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return sum(_objects(i) for i in result)
+    return 1 + len(getattr(result, 'matches', None) or ()) + len(getattr(result, 'participants', None) or ())
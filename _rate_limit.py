@@ -0,0 +1,99 @@
+import random
+import threading
+import time
+import datetime
+from email.utils import parsedate_to_datetime
+
+
+# A thread-safe token bucket shared by every request made through one client.
+#
+# `rate` tokens are added per second up to `burst`. Callers reserve a token and
+# sleep for the returned delay, which lets both the sync and async clients use it.
+class TokenBucket:
+    def __init__(self, rate, burst = None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    # Takes one token and returns how many seconds the caller must wait before sending.
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.blocked_until - now)
+
+    # Takes one token only if it is available right now.
+    def try_acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1 or now < self.blocked_until:
+                return False
+            self.tokens -= 1
+            return True
+
+    # Holds back every caller for `seconds`, e.g. after the server answered 429.
+    def pause(self, seconds):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+# Decides whether and when a failed request is retried.
+#
+# Retries use full-jitter exponential backoff unless the server sends
+# `Retry-After`, and stop once `max_retries` or the total `deadline` (seconds
+# since the first attempt) would be exceeded.
+#
+# A 502 or 504 may come back after the server already acted on the request,
+# so requests that are not idempotent (POST creates tournaments, participants
+# and runs actions) are only retried on the statuses in `POST_RETRY_STATUSES`,
+# where the server turned them away.
+class RetryPolicy:
+    RETRY_STATUSES = (429, 502, 503, 504)
+    POST_RETRY_STATUSES = (429, 503)
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+    def __init__(self, max_retries = 5, backoff = 0.5, max_backoff = 30, deadline = 60):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+
+    # Returns the delay before the next attempt, or None if the request should fail now.
+    def next_delay(self, status_code, retry_after, attempt, started, method = 'GET'):
+        statuses = self.RETRY_STATUSES if method in self.IDEMPOTENT_METHODS else self.POST_RETRY_STATUSES
+        if status_code not in statuses or attempt >= self.max_retries:
+            return None
+
+        delay = _parse_retry_after(retry_after)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+        if time.monotonic() + delay - started > self.deadline:
+            return None
+        return delay
+
+
+# `Retry-After` is either a number of seconds or an HTTP date.
+def _parse_retry_after(value):
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
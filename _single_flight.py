@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Collapses identical calls made at the same time into one.
+#
+# The first caller for a key runs `fetch`; callers arriving with the same key
+# while it runs wait for it and get the same result, or the same exception.
+# `do` returns the result and whether it was shared. `forget` detaches the
+# calls in flight, so later callers start a new one (e.g. after a write).
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    def do(self, key, fetch):
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fetch()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+            flight.done.set()
+
+    def forget(self):
+        with self.lock:
+            self.flights.clear()
+
+
+# The asyncio counterpart of `SingleFlight`. `fetch` is a coroutine function.
+#
+# The call runs in its own task, so cancelling the caller that started it
+# does not cancel it for the others.
+class AsyncSingleFlight:
+    def __init__(self):
+        self.flights = {}
+
+    async def do(self, key, fetch):
+        task = self.flights.get(key)
+        shared = task is not None
+        if not shared:
+            task = self.flights[key] = asyncio.ensure_future(fetch())
+            task.add_done_callback(lambda task: self._done(key, task))
+        return await asyncio.shield(task), shared
+
+    def forget(self):
+        self.flights.clear()
+
+    def _done(self, key, task):
+        if self.flights.get(key) is task:
+            del self.flights[key]
+        # Retrieve the exception so it is not reported as unhandled when
+        # every caller was cancelled.
+        if not task.cancelled():
+            task.exception()
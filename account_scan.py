@@ -0,0 +1,99 @@
+import asyncio
+import datetime
+
+import requests
+
+from _data_management import _count
+from _errors import *
+
+
+ONE_DAY = datetime.timedelta(days = 1)
+
+
+# The resumable state of a `Tournaments.scan`.
+#
+# The date range is cut into windows of `window_days` days. A window stays
+# pending until all of its tournaments have been handed out, and the id of each
+# tournament is remembered once the consumer has taken it, so a scan that failed
+# part way can be restarted from the same cursor (or one restored with
+# `from_dict`) without starting over.
+class ScanCursor:
+    def __init__(self, created_after, created_before, window_days = 30):
+        created_after = _to_date(created_after, 'created_after')
+        created_before = _to_date(created_before, 'created_before')
+        if created_before < created_after:
+            raise BadArgument('Parameter `created_before` must not be earlier than `created_after`')
+        _count('window_days', window_days)
+
+        self.pending = []
+        self.seen_ids = set()
+
+        start = created_after
+        while start <= created_before:
+            end = min(start + (window_days - 1) * ONE_DAY, created_before)
+            self.pending.append((start, end))
+            start = end + ONE_DAY
+
+    @property
+    def done(self):
+        return not self.pending
+
+    # The `created_after`/`created_before` filters for a window. They are
+    # widened by a day on each side because the API does not say whether its
+    # bounds are inclusive; the overlap is removed by deduplicating on id.
+    @staticmethod
+    def bounds(window):
+        return (window[0] - ONE_DAY).strftime('%Y-%m-%d'), (window[1] + ONE_DAY).strftime('%Y-%m-%d')
+
+    # Replaces a window with its two halves. Returns False for a single day, which cannot be split.
+    def split(self, window):
+        start, end = window
+        if start == end:
+            return False
+
+        middle = start + (end - start) // 2
+        index = self.pending.index(window)
+        self.pending[index:index + 1] = [(start, middle), (middle + ONE_DAY, end)]
+        return True
+
+    # The tournaments of a window that have not been handed out yet.
+    def unseen(self, tournaments):
+        new = {}
+        for tournament in tournaments:
+            if tournament.id not in self.seen_ids:
+                new.setdefault(tournament.id, tournament)
+        return list(new.values())
+
+    # Marks a window as finished once all of its tournaments were handed out.
+    def complete(self, window):
+        self.pending.remove(window)
+
+    def to_dict(self):
+        return {
+            "pending": [[i.isoformat(), j.isoformat()] for i, j in self.pending],
+            "seen_ids": sorted(self.seen_ids)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        cursor = cls.__new__(cls)
+        cursor.pending = [(datetime.date.fromisoformat(i), datetime.date.fromisoformat(j)) for i, j in data['pending']]
+        cursor.seen_ids = set(data['seen_ids'])
+        return cursor
+
+
+# Whether a failed window should be retried as two smaller ones.
+def _is_timeout(error):
+    if isinstance(error, (requests.Timeout, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, HTTPException) and error.status == 504
+
+def _to_date(value, name):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except:
+        raise BadArgument(f"Parameter `{name}` must be a `datetime.date` object or a string in the format `YYYY-MM-DD`")
@@ -0,0 +1,137 @@
+# Measures the client end to end against `MockChallonge`: throughput, p50/p99
+# latency, hydration time per object and peak memory of the main calls.
+#
+# Hydration is the time spent building models from an already decoded
+# response, and peak memory covers one call (response body, JSON and models).
+#
+# Run with: python benchmarks/bench_client.py [--tournaments 10000] [--players 256] [--latency 0.02] ...
+import argparse
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from challonge import Challonge
+from tournament import Matches, Tournament
+from mock_challonge import MockChallonge
+
+
+# A call to measure. `run(i)` makes the i-th call and returns how many objects
+# it built; `fetch()` returns a decoded response and `hydrate(payload)` builds
+# the models from it, or both are None when the call builds no models.
+class Scenario:
+    def __init__(self, name, run, fetch = None, hydrate = None):
+        self.name = name
+        self.run = run
+        self.fetch = fetch
+        self.hydrate = hydrate
+
+
+def scenarios(client, mock):
+    http = client.http
+    tournaments = client.tournaments
+    ids = mock.ids
+    updated = [tournaments.get(i) for i in ids[:16]]
+
+    def tournament_objects(tournament):
+        return 1 + len(tournament.matches) + len(tournament.participants or ())
+
+    return [
+        Scenario('Tournaments.get_all',
+            lambda i: len(tournaments.get_all()),
+            lambda: http.request('GET', "tournaments.json"),
+            lambda payload: len([Tournament(i, http) for i in payload])),
+        Scenario('Tournaments.get',
+            lambda i: tournament_objects(tournaments.get(ids[i % len(ids)], include_participants = True, include_matches = True)),
+            lambda: http.request('GET', f"tournaments/{ids[0]}.json", {"include_participants": 1, "include_matches": 1}),
+            lambda payload: tournament_objects(Tournament(payload, http))),
+        Scenario('Matches.get_all',
+            lambda i: len(Matches(http, ids[i % len(ids)]).get_all()),
+            lambda: http.request('GET', f"tournaments/{ids[0]}/matches.json"),
+            lambda payload: len([Matches._match_class(i, http) for i in payload])),
+        Scenario('Tournament.update',
+            lambda i: updated[i % len(updated)].update(name = f"Weekly #{i}") or 1),
+        Scenario('Tournaments.start_many',
+            lambda i: len(tournaments.start_many(ids[:64], concurrency = 16)))
+    ]
+
+
+def measure(scenario, calls, concurrency):
+    scenario.run(0)
+
+    def timed(i):
+        started = time.perf_counter()
+        objects = scenario.run(i)
+        return time.perf_counter() - started, objects
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers = concurrency) as executor:
+            results = list(executor.map(timed, range(calls)))
+    else:
+        results = [timed(i) for i in range(calls)]
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(i for i, j in results)
+    objects = sum(j for i, j in results)
+    result = {
+        'calls/s': calls / elapsed,
+        'objects/s': objects / elapsed,
+        'p50 ms': percentile(latencies, 0.50) * 1000,
+        'p99 ms': percentile(latencies, 0.99) * 1000,
+        'hydrate us/obj': None,
+        'peak MB': None
+    }
+
+    if scenario.fetch is not None:
+        payload = scenario.fetch()
+        count = scenario.hydrate(payload)
+        seconds = min(timeit.repeat(lambda: scenario.hydrate(payload), number = 1, repeat = 5))
+        result['hydrate us/obj'] = seconds / count * 1e6
+
+    tracemalloc.start()
+    scenario.run(calls)
+    result['peak MB'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tournaments', type = int, default = 1000, help = 'tournaments on the mock account')
+    parser.add_argument('--players', type = int, default = 512, help = 'participants per bracket (a power of two)')
+    parser.add_argument('--progress', type = float, default = 0.5, help = 'share of the matches that are complete')
+    parser.add_argument('--latency', type = float, default = 0.0, help = 'seconds the server waits before every response')
+    parser.add_argument('--jitter', type = float, default = 0.0, help = 'extra random latency, up to this many seconds')
+    parser.add_argument('--rate-limited', type = float, default = 0.0, help = 'share of requests answered 429')
+    parser.add_argument('--calls', type = int, default = 20, help = 'calls per scenario')
+    parser.add_argument('--concurrency', type = int, default = 1, help = 'threads making the calls')
+    parser.add_argument('--only', nargs = '*', help = 'scenarios to run, e.g. Matches.get_all')
+    args = parser.parse_args()
+
+    with MockChallonge(args.tournaments, args.players, args.progress, args.latency, args.jitter, args.rate_limited) as mock:
+        client = Challonge('benchmark', 'key', pool_size = max(10, args.concurrency), base_link = mock.base_link)
+        print(f"{args.tournaments} tournaments, {args.players} players, latency {args.latency * 1000:.0f} ms "
+            f"(+{args.jitter * 1000:.0f} ms), {args.rate_limited:.0%} rate limited, {args.calls} calls x {args.concurrency} threads")
+
+        columns = ('calls/s', 'objects/s', 'p50 ms', 'p99 ms', 'hydrate us/obj', 'peak MB')
+        print(f"{'':<22}" + "".join(f"{i:>16}" for i in columns))
+        for scenario in scenarios(client, mock):
+            if args.only and scenario.name not in args.only:
+                continue
+            result = measure(scenario, args.calls, args.concurrency)
+            print(f"{scenario.name:<22}" + "".join("{:>16}".format('-' if result[i] is None else f"{result[i]:.2f}") for i in columns))
+
+        print(f"{mock.requests} requests served, {mock.throttled} answered 429")
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
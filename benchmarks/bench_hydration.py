@@ -0,0 +1,95 @@
+# Compares the generated match hydrator against the hand-written `_load` that
+# `Match` used before, on the payloads of a 512-match bracket.
+#
+# Run with: python benchmarks/bench_hydration.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _data_management import _parse_datetime
+from _enums import MatchState
+from match import Match, MATCH_FIELDS
+
+
+class HTTP:
+    base_link = "https://api.challonge.com/v1/"
+    auth_info = None
+
+
+class HandWrittenMatch:
+    def __init__(self, raw_match_data, http):
+        self.http = http
+        self.base_api_link = http.base_link
+        self.auth_info = http.auth_info
+
+        raw_match_data = raw_match_data['match']
+        self._raw = raw_match_data
+
+        self.attachment_count = raw_match_data['attachment_count']
+        self.created_at = _parse_datetime(raw_match_data['created_at'])
+        self.group_id = raw_match_data['group_id']
+        self.has_attachment = raw_match_data['has_attachment']
+        self.id = raw_match_data['id']
+        self.identifier = raw_match_data['identifier']
+        self.location = raw_match_data['location']
+        self.loser_id = raw_match_data['loser_id']
+        self.player1_id = raw_match_data['player1_id']
+        self.player1_is_prereq_match_loser = raw_match_data['player1_is_prereq_match_loser']
+        self.player1_prereq_match_id = raw_match_data['player1_prereq_match_id']
+        self.player1_votes = raw_match_data['player1_votes']
+        self.player2_id = raw_match_data['player2_id']
+        self.player2_is_prereq_match_loser = raw_match_data['player2_is_prereq_match_loser']
+        self.player2_prereq_match_id = raw_match_data['player2_prereq_match_id']
+        self.player2_votes = raw_match_data['player2_votes']
+        self.round = raw_match_data['round']
+        self.scheduled_time = _parse_datetime(raw_match_data['scheduled_time'])
+        self.started_at = _parse_datetime(raw_match_data['started_at'])
+        self.state = MatchState(raw_match_data['state'])
+        self.tournament_id = raw_match_data['tournament_id']
+        self.underway_at = _parse_datetime(raw_match_data['underway_at'])
+        self.updated_at = _parse_datetime(raw_match_data['updated_at'])
+        self.winner_id = raw_match_data['winner_id']
+        self.prerequisite_match_ids_csv = raw_match_data['prerequisite_match_ids_csv']
+        self.scores_csv = raw_match_data['scores_csv']
+
+
+# 512 matches of one bracket, a third of them complete, as `get_all` returns them.
+PAYLOADS = []
+for i in range(512):
+    minute, second = divmod(i, 60)
+    complete = i % 3 == 0
+    PAYLOADS.append({"match": {
+        "attachment_count": None, "created_at": "2020-03-07T12:00:00.000-05:00", "group_id": None,
+        "has_attachment": False, "id": 200000 + i, "identifier": str(i), "location": None,
+        "loser_id": 2 * i + 1 if complete else None, "player1_id": 2 * i, "player1_is_prereq_match_loser": False,
+        "player1_prereq_match_id": None, "player1_votes": None, "player2_id": 2 * i + 1,
+        "player2_is_prereq_match_loser": False, "player2_prereq_match_id": None, "player2_votes": None,
+        "round": i % 9 + 1, "scheduled_time": None, "started_at": "2020-03-07T13:00:00.000-05:00",
+        "state": "complete" if complete else "open", "tournament_id": 9000,
+        "underway_at": f"2020-03-07T13:{minute % 60:02d}:{second:02d}.000-05:00" if complete else None,
+        "updated_at": f"2020-03-07T14:{minute % 60:02d}:{second:02d}.000-05:00", "winner_id": 2 * i if complete else None,
+        "prerequisite_match_ids_csv": "", "scores_csv": "2-1" if complete else ""
+    }})
+
+
+def bench(name, run, number = 20):
+    seconds = min(timeit.repeat(run, number = number, repeat = 7)) / number
+    print(f"{name:<28} {seconds * 1000:8.3f} ms per bracket ({len(PAYLOADS)} matches)")
+    return seconds
+
+
+if __name__ == '__main__':
+    http = HTTP()
+    for payload in PAYLOADS:
+        expected, actual = HandWrittenMatch(payload, http), Match(payload, http)
+        assert all(getattr(expected, i) == getattr(actual, i) for i, j, k in MATCH_FIELDS)
+        assert Match({"match": actual.to_dict()}, http).to_dict() == actual.to_dict()
+
+    baseline = bench("hand-written", lambda: [HandWrittenMatch(i, http) for i in PAYLOADS])
+    generated = bench("generated", lambda: [Match(i, http) for i in PAYLOADS])
+    matches = [Match(i, http) for i in PAYLOADS]
+    bench("to_dict", lambda: [i.to_dict() for i in matches])
+
+    print(f"speedup: {baseline / generated:.2f}x")
@@ -0,0 +1,50 @@
+# Compares the shared timestamp decoder against the strptime approach the
+# models used before, on the timestamps of a 512-match bracket.
+#
+# Run with: python benchmarks/bench_timestamps.py
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _data_management import _parse_datetime, _parse_timestamp
+
+
+def strptime_parse(value):
+    split_date = value.split(':')
+    date_str = ":".join(split_date[:-1]) + split_date[-1]
+    return datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
+
+
+# 512 matches with 5 timestamps each. `created_at` is shared by the whole
+# bracket while the other timestamps are mostly distinct, as in real payloads.
+TIMESTAMPS = []
+for i in range(512):
+    TIMESTAMPS.append("2020-03-07T12:00:00.000-05:00")
+    for j in range(4):
+        minute, second = divmod(i * 4 + j, 60)
+        TIMESTAMPS.append(f"2020-03-07T{13 + minute // 60:02d}:{minute % 60:02d}:{second:02d}.{i % 1000:03d}-05:00")
+
+
+def bench(name, parse, setup = None, number = 20):
+    def run():
+        if setup:
+            setup()
+        for i in TIMESTAMPS:
+            parse(i)
+
+    seconds = min(timeit.repeat(run, number = number, repeat = 5)) / number
+    print(f"{name:<28} {seconds * 1000:8.3f} ms per bracket ({len(TIMESTAMPS)} timestamps)")
+    return seconds
+
+
+if __name__ == '__main__':
+    assert all(strptime_parse(i) == _parse_datetime(i) for i in TIMESTAMPS)
+
+    baseline = bench("strptime", strptime_parse)
+    cold = bench("fromisoformat, cold cache", _parse_datetime, _parse_timestamp.cache_clear)
+    warm = bench("fromisoformat, warm cache", _parse_datetime)
+
+    print(f"speedup: {baseline / cold:.1f}x cold, {baseline / warm:.1f}x warm")
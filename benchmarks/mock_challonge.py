@@ -0,0 +1,286 @@
+# A local stand-in for the Challonge API, serving realistic fixtures so the
+# client can be measured without credentials or network noise.
+#
+# The account holds `tournaments` double-elimination tournaments of `players`
+# participants each. Brackets are simulated up to `progress` (the share of
+# matches that are complete) and built the first time they are requested.
+# Every request waits `latency` seconds, plus up to `jitter` more, and a
+# `rate_limited` share of requests is answered 429 with `Retry-After: 0`.
+#
+# Served: GET tournaments.json, GET, PUT and DELETE tournaments/{id}.json,
+# POST tournaments/{id}/{action}.json for the lifecycle actions (GET and the
+# actions honour include_matches/include_participants), GET
+# tournaments/{id}/matches.json and GET tournaments/{id}/participants.json.
+# List filters are ignored and actions only move the tournament's state.
+import datetime
+import functools
+import http.server
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _fields import model_fields
+from match import MATCH_FIELDS
+from participant import Participant
+from tournament import Tournament
+
+
+# The state each lifecycle action leaves a tournament in.
+ACTIONS = {
+    'process_check_ins': None, 'abort_check_in': None, 'open_for_predictions': None,
+    'start': 'underway', 'finalize': 'complete', 'reset': 'pending'
+}
+
+CREATED_AT = datetime.datetime(2020, 3, 7, 12, 0, tzinfo = datetime.timezone(datetime.timedelta(hours = -5)))
+
+
+class MockChallonge:
+    def __init__(self, tournaments = 1000, players = 512, progress = 0.5, latency = 0.0, jitter = 0.0, rate_limited = 0.0, seed = 0):
+        if players < 4 or not players & (players - 1) == 0:
+            raise ValueError('players must be a power of two of at least 4')
+
+        self.tournaments = tournaments
+        self.players = players
+        self.progress = progress
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limited = rate_limited
+        self.seed = seed
+
+        self.requests = 0
+        self.throttled = 0
+        self.updates = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._index = None
+
+    @property
+    def base_link(self):
+        return f"http://127.0.0.1:{self._server.server_port}/v1/"
+
+    # The IDs of every tournament of the account.
+    @property
+    def ids(self):
+        return range(1, self.tournaments + 1)
+
+    def start(self):
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.mock = self
+        threading.Thread(target = self._server.serve_forever, daemon = True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    # Returns the status, extra headers and body of a request.
+    def handle(self, method, path, query):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            throttled = self._random.random() < self.rate_limited
+            if throttled:
+                self.throttled += 1
+        if delay:
+            time.sleep(delay)
+        if throttled:
+            return 429, (('Retry-After', '0'),), b'{"errors": ["Rate limit exceeded"]}'
+
+        parts = path.strip('/').split('/')
+        if parts == ['v1', 'tournaments.json'] and method == 'GET':
+            return 200, (), self._tournament_index()
+
+        try:
+            id = int(parts[2].split('.')[0])
+        except (IndexError, ValueError):
+            return 404, (), b'{"errors": ["Not found"]}'
+        if not 1 <= id <= self.tournaments:
+            return 404, (), b'{"errors": ["Tournament not found"]}'
+
+        if len(parts) == 3 and method == 'GET':
+            return 200, (), self._tournament(id, query.get('include_matches') == ['1'], query.get('include_participants') == ['1'])
+        if len(parts) == 3 and method == 'PUT':
+            updates = {i[len('tournament['):-1]: j[0] for i, j in query.items() if i.startswith('tournament[')}
+            with self._lock:
+                self.updates.setdefault(id, {}).update(updates)
+            return 200, (), json.dumps({"tournament": self._tournament_data(id)}).encode()
+        if len(parts) == 3 and method == 'DELETE':
+            return 200, (), json.dumps({"tournament": self._tournament_data(id)}).encode()
+        if len(parts) == 4 and method == 'POST' and parts[3].split('.')[0] in ACTIONS:
+            state = ACTIONS[parts[3].split('.')[0]]
+            if state is not None:
+                with self._lock:
+                    self.updates.setdefault(id, {})['state'] = state
+            return 200, (), self._tournament(id, query.get('include_matches') == ['1'], query.get('include_participants') == ['1'])
+        if parts[3:] == ['matches.json'] and method == 'GET':
+            return 200, (), self._matches(id)
+        if parts[3:] == ['participants.json'] and method == 'GET':
+            return 200, (), self._participants(id)
+        return 404, (), b'{"errors": ["Not found"]}'
+
+    def _tournament_index(self):
+        if self._index is None:
+            self._index = json.dumps([{"tournament": self._tournament_data(i)} for i in self.ids]).encode()
+        return self._index
+
+    def _tournament(self, id, include_matches, include_participants):
+        data = self._tournament_data(id)
+        if include_matches:
+            data['matches'] = self._bracket(id)[0]
+        if include_participants:
+            data['participants'] = self._bracket(id)[1]
+        return json.dumps({"tournament": data}).encode()
+
+    def _matches(self, id):
+        return json.dumps(self._bracket(id)[0]).encode()
+
+    def _participants(self, id):
+        return json.dumps(self._bracket(id)[1]).encode()
+
+    def _tournament_data(self, id):
+        data = tournament_payload(id, self.players, self.progress)
+        data.update(self.updates.get(id, {}))
+        return data
+
+    @functools.lru_cache(maxsize = 32)
+    def _bracket(self, id):
+        return double_elimination(id, self.players, self.progress, random.Random(self.seed * 100003 + id))
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    # Concurrent clients open many connections at once; the default backlog of
+    # 5 drops the rest, which then wait a second for the SYN to be retried.
+    request_queue_size = 128
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, small responses
+    # wait for the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        url = urllib.parse.urlsplit(self.path)
+        status, headers, body = self.server.mock.handle(self.command, url.path, urllib.parse.parse_qs(url.query))
+
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_PUT = do_POST = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+def _timestamp(minutes):
+    return (CREATED_AT + datetime.timedelta(minutes = minutes)).isoformat(timespec = 'milliseconds')
+
+# The payload of one tournament, with every field the `Tournament` model reads.
+def tournament_payload(id, players, progress):
+    data = dict.fromkeys(key for name, key, decoder in model_fields(Tournament))
+    data.update({
+        "id": id, "name": f"Weekly #{id}", "description": "", "tournament_type": "double elimination",
+        "created_at": _timestamp(-id), "updated_at": _timestamp(id), "started_at": _timestamp(0),
+        "state": "underway" if progress < 1 else "complete", "progress_meter": int(progress * 100),
+        "open_signup": False, "private": False, "hold_third_place_match": False, "ranked_by": "match wins",
+        "pts_for_match_win": "1.0", "pts_for_match_tie": "0.5", "pts_for_game_win": "0.0", "pts_for_game_tie": "0.0",
+        "pts_for_bye": "1.0", "rr_pts_for_match_win": "1.0", "rr_pts_for_match_tie": "0.5",
+        "rr_pts_for_game_win": "0.0", "rr_pts_for_game_tie": "0.0", "swiss_rounds": 0, "signup_cap": None,
+        "participants_count": players, "check_in_duration": None, "grand_finals_modifier": None,
+        "tie_breaks": ["match wins vs tied", "game wins", "points scored"], "game_name": "Chess",
+        "full_challonge_url": f"https://challonge.com/weekly_{id}", "live_image_url": f"https://challonge.com/weekly_{id}.svg",
+        "sign_up_url": None, "subdomain": None
+    })
+    return data
+
+# The matches and participants of a double-elimination bracket, simulated so
+# that the first `progress` share of matches is complete, the matches whose
+# players are known are open and the rest are pending.
+def double_elimination(tournament_id, players, progress, random):
+    participant_ids = [tournament_id * 10000 + i for i in range(1, players + 1)]
+    participants = []
+    for seed, participant_id in enumerate(participant_ids, 1):
+        data = dict.fromkeys(key for name, key, decoder in model_fields(Participant))
+        data.update({
+            "id": participant_id, "tournament_id": tournament_id, "name": f"Player {seed}", "seed": seed,
+            "active": True, "created_at": _timestamp(seed), "updated_at": _timestamp(seed), "misc": None,
+            "on_waiting_list": False, "checked_in": False, "can_check_in": False, "group_player_ids": []
+        })
+        participants.append({"participant": data})
+
+    # Each side of a match is a seed, or the winner or loser of an earlier match.
+    sources = []
+    rounds = []
+
+    def add(round, side1, side2):
+        sources.append((side1, side2))
+        rounds.append(round)
+        return len(sources) - 1
+
+    winners = [add(1, ('seed', i), ('seed', players - 1 - i)) for i in range(players // 2)]
+    losers = [add(-1, ('loser', winners[i]), ('loser', winners[i + 1])) for i in range(0, len(winners), 2)]
+    depth = players.bit_length() - 1
+    for round in range(2, depth + 1):
+        previous = winners
+        winners = [add(round, ('winner', previous[i]), ('winner', previous[i + 1])) for i in range(0, len(previous), 2)]
+        losers = [add(-(2 * round - 2), ('winner', i), ('loser', j)) for i, j in zip(losers, reversed(winners))]
+        if round < depth:
+            losers = [add(-(2 * round - 1), ('winner', losers[i]), ('winner', losers[i + 1])) for i in range(0, len(losers), 2)]
+    add(depth + 1, ('winner', winners[0]), ('winner', losers[0]))
+
+    first_id = tournament_id * 100000
+    complete = int(len(sources) * progress)
+    results = []
+    matches = []
+    for index, (side1, side2) in enumerate(sources):
+        player1, player2 = (_player(i, participant_ids, results) for i in (side1, side2))
+        data = dict.fromkeys(name for name, key, decoder in MATCH_FIELDS)
+        data.update({
+            "id": first_id + index, "tournament_id": tournament_id, "identifier": str(index + 1), "round": rounds[index],
+            "player1_id": player1, "player2_id": player2, "created_at": _timestamp(0), "updated_at": _timestamp(index),
+            "attachment_count": None, "has_attachment": False, "scores_csv": "", "state": "pending",
+            "player1_is_prereq_match_loser": side1[0] == 'loser', "player2_is_prereq_match_loser": side2[0] == 'loser',
+            "player1_prereq_match_id": None if side1[0] == 'seed' else first_id + side1[1],
+            "player2_prereq_match_id": None if side2[0] == 'seed' else first_id + side2[1],
+            "prerequisite_match_ids_csv": ",".join(str(first_id + i[1]) for i in (side1, side2) if not i[0] == 'seed')
+        })
+
+        if player1 is not None and player2 is not None:
+            data.update({"state": "open", "started_at": _timestamp(index // 4), "underway_at": None})
+        if index < complete and player1 is not None and player2 is not None:
+            score1, score2 = (2, random.randint(0, 1)) if random.random() < 0.5 else (random.randint(0, 1), 2)
+            winner, loser = (player1, player2) if score1 > score2 else (player2, player1)
+            data.update({
+                "state": "complete", "scores_csv": f"{score1}-{score2}", "winner_id": winner,
+                "loser_id": loser, "underway_at": _timestamp(index // 4 + 1), "updated_at": _timestamp(index // 4 + 30)
+            })
+            results.append((winner, loser))
+        else:
+            results.append((None, None))
+        matches.append({"match": data})
+    return matches, participants
+
+def _player(side, participant_ids, results):
+    kind, value = side
+    if kind == 'seed':
+        return participant_ids[value]
+    return results[value][0 if kind == 'winner' else 1]
@@ -0,0 +1,158 @@
+from _enums import MatchState
+
+
+# The bracket of a tournament as a graph of matches, built from the prerequisite
+# fields every match carries.
+#
+# All lookups are dictionary reads: which match the winner and the loser of a
+# match move on to, which matches feed a match, the match a participant is
+# currently waiting on, and how many more matches they play if they keep
+# winning. Matches are also ordered topologically and grouped into levels,
+# where every match comes after the matches that feed it.
+#
+# `update` applies one changed match without rebuilding the whole graph.
+class BracketGraph:
+    def __init__(self, matches):
+        self.matches = {match.id: match for match in matches}
+        self._build()
+
+    # The match the winner of `match_id` plays next, or None.
+    def winner_next(self, match_id):
+        return self._get(self._winner_next.get(match_id))
+
+    # The match the loser of `match_id` plays next, or None if the loser is out.
+    def loser_next(self, match_id):
+        return self._get(self._loser_next.get(match_id))
+
+    # The matches whose winner or loser feeds `match_id`.
+    def upstream(self, match_id):
+        return [self.matches[i] for i in self._upstream.get(match_id, ())]
+
+    # The unfinished match a participant is in or waiting on, or None.
+    def current_match(self, participant_id):
+        return self._get(self._current.get(participant_id))
+
+    # How many more matches a participant plays if they win every one of them.
+    # 0 once they are out or have finished.
+    def remaining_depth(self, participant_id):
+        match_id = self._current.get(participant_id)
+        return 0 if match_id is None else self._depth[match_id]
+
+    # Every match, each after all of the matches that feed it.
+    def order(self):
+        return [self.matches[i] for i in self._order]
+
+    # The matches grouped by their distance from the first matches of the bracket.
+    def levels(self):
+        levels = []
+        for match_id in self._order:
+            level = self._level[match_id]
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(self.matches[match_id])
+        return levels
+
+    # Applies a single changed match. The participant index is patched in
+    # place; the graph is only rebuilt if the match's prerequisites changed.
+    def update(self, match):
+        previous = self.matches.get(match.id)
+        self.matches[match.id] = match
+        if previous is None or not _prerequisites(previous) == _prerequisites(match):
+            self._build()
+            return
+
+        for participant_id in (previous.player1_id, previous.player2_id):
+            if participant_id is not None:
+                self._open.get(participant_id, set()).discard(match.id)
+        self._index_players(match)
+        for participant_id in {previous.player1_id, previous.player2_id, match.player1_id, match.player2_id}:
+            if participant_id is not None:
+                self._pick_current(participant_id)
+
+    def _get(self, match_id):
+        return None if match_id is None else self.matches.get(match_id)
+
+    def _build(self):
+        self._winner_next = {}
+        self._loser_next = {}
+        self._upstream = {}
+        downstream = {match_id: [] for match_id in self.matches}
+
+        for match in self.matches.values():
+            upstream = []
+            for prerequisite_id, is_loser in _prerequisites(match):
+                if prerequisite_id not in self.matches or prerequisite_id in upstream:
+                    continue
+                upstream.append(prerequisite_id)
+                downstream[prerequisite_id].append(match.id)
+                if is_loser:
+                    self._loser_next[prerequisite_id] = match.id
+                else:
+                    self._winner_next[prerequisite_id] = match.id
+            self._upstream[match.id] = upstream
+
+        # Kahn's algorithm, recording each match's level on the way.
+        waiting = {i: len(j) for i, j in self._upstream.items()}
+        self._level = {}
+        self._order = sorted((i for i, j in waiting.items() if j == 0), key = self._sort_key)
+        for match_id in self._order:
+            self._level.setdefault(match_id, 0)
+        index = 0
+        while index < len(self._order):
+            match_id = self._order[index]
+            index += 1
+            for next_id in downstream[match_id]:
+                self._level[next_id] = max(self._level.get(next_id, 0), self._level[match_id] + 1)
+                waiting[next_id] -= 1
+                if waiting[next_id] == 0:
+                    self._order.append(next_id)
+
+        self._depth = {}
+        for match_id in reversed(self._order):
+            next_id = self._winner_next.get(match_id)
+            self._depth[match_id] = 1 + (self._depth.get(next_id, 0) if next_id is not None else 0)
+
+        self._position = {match_id: index for index, match_id in enumerate(self._order)}
+        self._open = {}
+        self._current = {}
+        for match_id in self._order:
+            self._index_players(self.matches[match_id])
+        for participant_id in self._open:
+            self._pick_current(participant_id)
+
+    # Records the unfinished matches every participant is in.
+    def _index_players(self, match):
+        if match.state == MatchState.complete:
+            return
+        for participant_id in (match.player1_id, match.player2_id):
+            if participant_id is not None:
+                self._open.setdefault(participant_id, set()).add(match.id)
+
+    # A participant's current match is their earliest unfinished one: the
+    # lowest level, then the first in `order`.
+    def _pick_current(self, participant_id):
+        open = self._open.get(participant_id)
+        if open:
+            self._current[participant_id] = min(open, key = lambda i: (self._level.get(i, 0), self._position.get(i, 0)))
+        else:
+            self._current.pop(participant_id, None)
+
+    def _sort_key(self, match_id):
+        match = self.matches[match_id]
+        return (abs(match.round or 0), match.id)
+
+
+# The (match id, fed by its loser) pairs a match depends on. The dedicated
+# player fields come first; `prerequisite_match_ids_csv` fills in the rest.
+def _prerequisites(match):
+    prerequisites = []
+    for match_id, is_loser in ((match.player1_prereq_match_id, match.player1_is_prereq_match_loser),
+        (match.player2_prereq_match_id, match.player2_is_prereq_match_loser)):
+        if match_id is not None:
+            prerequisites.append((match_id, bool(is_loser)))
+
+    known = {i for i, j in prerequisites}
+    for match_id in (match.prerequisite_match_ids_csv or '').split(','):
+        if match_id.strip() and int(match_id) not in known:
+            prerequisites.append((int(match_id), False))
+    return prerequisites
@@ -1,105 +1,107 @@
-import requests
-import re
-from urllib.parse import urlencode
-import datetime
-
-from tournament import Tournament
-from _data_management import _prepare_params
-from _enums import TournamentType, TournamentRankedBy, TournamentGrandFinalModifier
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from account_scan import ScanCursor, _is_timeout
+from tournament import Tournament, AsyncTournament
+from _data_management import _prepare_params, _tournament_filters, _new_tournament_settings, _new_tournaments_params, _count, _JSONArrayParser
+from _enums import TournamentType
 from _errors import *
-
-
-BASE_LINK = "https://api.challonge.com/v1/"
+from _http import HTTPClient, BASE_LINK
+from _rate_limit import TokenBucket, RetryPolicy
+from _cache import ResponseCache
+from _instrumentation import RequestRecord, RequestStats
 
 
 # A wrapper for all tournament related API calls.
 class Tournaments:
-    def __init__(self, auth_info):
-        self.auth_info = auth_info
-        self.base_link = BASE_LINK
+    _tournament_class = Tournament
+
+    def __init__(self, http):
+        self.http = http
+        self.auth_info = http.auth_info
+        self.base_link = http.base_link
 
     # Retrieves all tournaments visible to an account.
     def get_all(self, state = None, tournament_type = None, created_after = None, created_before = None, subdomain = None):
-        req_url = self.base_link + f"tournaments.json"
-
-        data = {}
-
-        if state:
-            if not isinstance(state, TournamentState):
-                try:
-                    state = TournamentState(state)
-                except:
-                    raise BadArgument(f"Parameter `state` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(TournamentState)])}")
-
-            data['state'] = state.name
-
-        if tournament_type:
-            if not isinstance(tournament_type, TournamentType):
-                try:
-                    tournament_type = TournamentType(tournament_type)
-                except:
-                    raise BadArgument(f"Parameter `tournament_type` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(TournamentType)])}")
-
-            data['state'] = state.name
-
-        if created_after:
-            if isinstance(created_after, datetime.datetime):
-                created_after = created_after.strftime('%Y-%m-%d')
-            else:
-                try:
-                    datetime.datetime.strptime(created_after, '%Y-%m-%d')
-                    created_after = created_after.strftime('%Y-%m-%d')
-                except:
-                    raise BadArgument(f"Parameter `created_after` must be a `datetime.datetime` object or a string in the format `YYYY-MM-DD`")
-            data['created_after'] = created_after
-
-        if created_before:
-            if isinstance(created_before, datetime.datetime):
-                created_before = created_before.strftime('%Y-%m-%d')
-            else:
-                try:
-                    datetime.datetime.strptime(created_before, '%Y-%m-%d')
-                    created_before = created_before.strftime('%Y-%m-%d')
-                except:
-                    raise BadArgument(f"Parameter `created_before` must be a `datetime.datetime` object or a string in the format `YYYY-MM-DD`")
-            data['created_before'] = created_before
-
-        if subdomain:
-            if not isinstance(subdomain, str):
-                raise BadArgument(f"Parameter `subdomain` must be of type str")
-            if len(subdomain) > 60:
-                raise BadArgument('Parameter `subdomain` cannot be more than 60 characters')
-            patterns = '^[a-zA-Z0-9_]*$'
-            if not re.search(patterns,  subdomain):
-                raise BadArgument('Parameter `subdomain` can only be letters, numbers, and underscores')
-            data['subdomain'] = subdomain
-
-        url_params = ""
-        if len(data.keys()) > 0:
-            url_params = "?" + urlencode(_prepare_params(data))
-
-        req = requests.get(req_url, auth = self.auth_info)
-        if not req.status_code == 200:
-            raise HTTPException(req.status_code)
-        else:
-            return [Tournament(tournament_data, self.base_link, self.auth_info) for tournament_data in req.json()]
+        data = _tournament_filters(state, tournament_type, created_after, created_before, subdomain)
+
+        return self.http.request('GET', "tournaments.json", _prepare_params(data), hydrate = self._wrap_all)
+
+    # Like `get_all`, but yields each tournament as soon as it has been read
+    # from the response, so memory stays flat however large the account is.
+    def iter_all(self, state = None, tournament_type = None, created_after = None, created_before = None, subdomain = None):
+        data = _tournament_filters(state, tournament_type, created_after, created_before, subdomain)
+
+        parser = _JSONArrayParser()
+        yield from self.http.stream('GET', "tournaments.json", _prepare_params(data),
+            hydrate = lambda chunk: [Tournament(i, self.http) for i in parser.feed(chunk)])
+        parser.close()
+
+    # Scans the date range of a `ScanCursor` window by window, `concurrency` windows
+    # at a time, yielding each tournament once as its window finishes.
+    #
+    # A window that times out, or returns `split_above` tournaments or more, is split
+    # in two and fetched again. If the scan fails, the cursor keeps its progress and
+    # can be passed to `scan` again to resume.
+    def scan(self, cursor, state = None, tournament_type = None, subdomain = None, split_above = 500, concurrency = 4):
+        _count('concurrency', concurrency)
+
+        def fetch(window):
+            created_after, created_before = cursor.bounds(window)
+            return self.get_all(state, tournament_type, created_after, created_before, subdomain)
+
+        with ThreadPoolExecutor(max_workers = concurrency) as executor:
+            running = {}
+            while cursor.pending or running:
+                for window in cursor.pending:
+                    if len(running) >= concurrency:
+                        break
+                    if window not in running.values():
+                        running[executor.submit(fetch, window)] = window
+
+                done, _ = wait(running, return_when = FIRST_COMPLETED)
+                for future in done:
+                    window = running.pop(future)
+                    try:
+                        tournaments = future.result()
+                    except Exception as e:
+                        if _is_timeout(e) and cursor.split(window):
+                            continue
+                        raise
+
+                    if len(tournaments) >= split_above and cursor.split(window):
+                        continue
+
+                    for tournament in cursor.unseen(tournaments):
+                        yield tournament
+                        cursor.seen_ids.add(tournament.id)
+                    cursor.complete(window)
 
     # Retrieves a specific tournament by ID
     def get(self, id, include_participants = False, include_matches = False):
-        req_url = self.base_link + f"tournaments/{id}.json"
-
         data = {
             "include_participants": int(include_participants),
             "include_matches": int(include_matches)
         }
 
-        url_params = '?' + urlencode(_prepare_params(data))
+        return self.http.request('GET', f"tournaments/{id}.json", _prepare_params(data), hydrate = self._wrap)
+
+    # Retrieves many tournaments by ID or url at once, with at most `concurrency` requests in flight.
+    #
+    # Results keep the order of `ids`. A tournament that fails to load is returned in
+    # its place as the `HTTPException` raised for it, instead of aborting the whole batch.
+    def get_many(self, ids, include_participants = False, include_matches = False, concurrency = 10):
+        _count('concurrency', concurrency)
+
+        def fetch(id):
+            try:
+                return self.get(id, include_participants, include_matches)
+            except HTTPException as e:
+                return e
 
-        req = requests.get(req_url + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            raise HTTPException(req.status_code)
-        else:
-            return Tournament(req.json(), self.base_link, self.auth_info)
+        with ThreadPoolExecutor(max_workers = concurrency) as executor:
+            return list(executor.map(fetch, ids))
 
     # Create a tournament.
     def create(self, name, url, tournament_type = TournamentType('single elimination'),
@@ -111,220 +113,345 @@ class Tournaments:
         notify_users_when_matches_open = None, notify_users_when_the_tournament_ends = None,
         sequential_pairings = None, signup_cap = None, start_at = None, check_in_duration = None,
         grand_finals_modifier = None):
-        req_url = self.base_link + "tournaments.json"
-
-        data = {}
-
-        if not isinstance(name, str):
-            raise BadArgument('Parameter `name` must be of type str')
-        if len(name) > 60:
-            raise BadArgument('Parameter `name` cannot be more than 60 characters')
-        data['name'] = name
-
-        if not isinstance(url, str):
-            raise BadArgument('Parameter `url` must be of type str')
-        if len(url) > 60:
-            raise BadArgument('Parameter `url` cannot be more than 60 characters')
-        patterns = '^[a-zA-Z0-9_]*$'
-        if not re.search(patterns,  url):
-            raise BadArgument('Parameter `url` can only be letters, numbers, and underscores')
-        data['url'] = url
-
-        if not isinstance(tournament_type, TournamentType):
+        data = _new_tournament_settings(name, url, tournament_type, subdomain, description, open_signup,
+            hold_third_place_match, pts_for_match_win, pts_for_match_tie, pts_for_game_win, pts_for_game_tie,
+            swiss_rounds, pts_for_bye, ranked_by, rr_pts_for_match_win, rr_pts_for_match_tie,
+            rr_pts_for_game_win, rr_pts_for_game_tie, accept_attachments, hide_forum, show_rounds, private,
+            notify_users_when_matches_open, notify_users_when_the_tournament_ends, sequential_pairings,
+            signup_cap, start_at, check_in_duration, grand_finals_modifier)
+
+        return self.http.request('POST', "tournaments.json", _prepare_params(data, 'tournament'), hydrate = self._wrap)
+
+    # Creates many tournaments at once, with at most `concurrency` requests in flight.
+    #
+    # `payloads` is a list of dicts of the arguments of `create`. Every payload is
+    # validated and encoded before anything is sent, and a `BadArgument` lists all
+    # of the invalid ones. Results keep the order of `payloads`; a tournament that
+    # could not be created is returned in its place as its `HTTPException`.
+    def create_many(self, payloads, concurrency = 10):
+        _count('concurrency', concurrency)
+        batch = _new_tournaments_params(payloads)
+
+        def create(params):
             try:
-                tournament_type = TournamentType(tournament_type)
-            except:
-                raise BadArgument(f"Parameter `tournament_type` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(TournamentType)])}")
-        data['tournament_type'] = tournament_type
-
-        if subdomain is not None:
-            patterns = '^[a-zA-Z0-9_]*$'
-            if not re.search(patterns,  subdomain):
-                raise BadArgument('Parameter `subdomain` can only be letters, numbers, and underscores')
+                return self.http.request('POST', "tournaments.json", params, hydrate = self._wrap)
+            except HTTPException as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers = concurrency) as executor:
+            return list(executor.map(create, batch))
+
+    # Sends a lifecycle action to many tournaments at once, with at most
+    # `concurrency` requests in flight and every request still going through the
+    # client's rate limiter.
+    #
+    # `tournaments` holds `Tournament` objects, which are refreshed in place, or
+    # IDs/urls, for which a new `Tournament` is built from the response. Results
+    # keep the order of `tournaments`: each is the tournament, or the
+    # `HTTPException` raised for it. With `stop_on_failure`, no request is sent
+    # after the first failure and the tournaments not yet sent are None.
+    def start_many(self, tournaments, include_participants = False, include_matches = False, concurrency = 10, stop_on_failure = False):
+        return self._act_many('start', tournaments, include_participants, include_matches, concurrency, stop_on_failure)
+
+    # See `start_many`.
+    def finalize_many(self, tournaments, include_participants = False, include_matches = False, concurrency = 10, stop_on_failure = False):
+        return self._act_many('finalize', tournaments, include_participants, include_matches, concurrency, stop_on_failure)
+
+    # See `start_many`.
+    def reset_many(self, tournaments, include_participants = False, include_matches = False, concurrency = 10, stop_on_failure = False):
+        return self._act_many('reset', tournaments, include_participants, include_matches, concurrency, stop_on_failure)
+
+    # See `start_many`.
+    def process_check_ins_many(self, tournaments, include_participants = False, include_matches = False, concurrency = 10, stop_on_failure = False):
+        return self._act_many('process_check_ins', tournaments, include_participants, include_matches, concurrency, stop_on_failure)
+
+    # Deletes many tournaments at once, like `start_many`. Each result is the
+    # tournament or ID as passed, once deleted.
+    def delete_many(self, tournaments, concurrency = 10, stop_on_failure = False):
+        def delete(tournament):
+            if isinstance(tournament, Tournament):
+                tournament.delete()
             else:
-                data['subdomain'] = subdomain
+                self.http.request('DELETE', f"tournaments/{tournament}.json")
+            return tournament
 
-        if description is not None:
-            if not isinstance(description, str):
-                raise BadArgument('Parameter `description` must be of type str')
-            else:
-                data['description'] = description
+        return self._run_many(delete, _tournaments(tournaments), concurrency, stop_on_failure)
 
-        if open_signup is not None:
-            if not isinstance(open_signup, bool):
-                raise BadArgument('Parameter `open_signup` must be of type bool')
-            else:
-                data['open_signup'] = open_signup
+    def _act_many(self, action, tournaments, include_participants, include_matches, concurrency, stop_on_failure):
+        params = _action_params(include_participants, include_matches)
 
-        if hold_third_place_match is not None:
-            if not isinstance(hold_third_place_match, bool):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type bool')
-            else:
-                data['hold_third_place_match'] = hold_third_place_match
+        def act(tournament):
+            if isinstance(tournament, Tournament):
+                tournament._action(action, include_participants, include_matches)
+                return tournament
+            return self.http.request('POST', f"tournaments/{tournament}/{action}.json", params, hydrate = self._wrap)
 
-        if pts_for_match_win is not None:
-            if not (isinstance(pts_for_match_win, int) or isinstance(pts_for_match_win, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                pts_for_match_win = round(float(pts_for_match_win), 1)
-                data['pts_for_match_win'] = pts_for_match_win
+        return self._run_many(act, _tournaments(tournaments), concurrency, stop_on_failure)
 
-        if pts_for_match_tie is not None:
-            if not (isinstance(pts_for_match_tie, int) or isinstance(pts_for_match_tie, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                pts_for_match_tie = round(float(pts_for_match_tie), 1)
-                data['pts_for_match_tie'] = pts_for_match_tie
+    # Calls `run` on every item from a pool of `concurrency` threads. An item's
+    # `HTTPException` is returned as its result.
+    def _run_many(self, run, items, concurrency, stop_on_failure):
+        _count('concurrency', concurrency)
+        failed = threading.Event()
 
-        if pts_for_game_win is not None:
-            if not (isinstance(pts_for_game_win, int) or isinstance(pts_for_game_win, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                pts_for_game_win = round(float(pts_for_game_win), 1)
-                data['pts_for_game_win'] = pts_for_game_win
+        def attempt(item):
+            if failed.is_set():
+                return None
+            try:
+                return run(item)
+            except HTTPException as e:
+                if stop_on_failure:
+                    failed.set()
+                return e
+
+        with ThreadPoolExecutor(max_workers = concurrency) as executor:
+            return list(executor.map(attempt, items))
+
+    def _wrap(self, tournament_data):
+        return self._tournament_class(tournament_data, self.http)
+
+    def _wrap_all(self, tournaments_data):
+        return [self._tournament_class(tournament_data, self.http) for tournament_data in tournaments_data]
+
+# The asyncio counterpart of `Tournaments`, returning `AsyncTournament` objects.
+class AsyncTournaments(Tournaments):
+    _tournament_class = AsyncTournament
+
+    async def get_all(self, state = None, tournament_type = None, created_after = None, created_before = None, subdomain = None):
+        data = _tournament_filters(state, tournament_type, created_after, created_before, subdomain)
+
+        return await self.http.request('GET', "tournaments.json", _prepare_params(data), hydrate = self._wrap_all)
+
+    async def iter_all(self, state = None, tournament_type = None, created_after = None, created_before = None, subdomain = None):
+        data = _tournament_filters(state, tournament_type, created_after, created_before, subdomain)
+
+        parser = _JSONArrayParser()
+        async for tournament in self.http.stream('GET', "tournaments.json", _prepare_params(data),
+            hydrate = lambda chunk: [AsyncTournament(i, self.http) for i in parser.feed(chunk)]):
+            yield tournament
+        parser.close()
+
+    # See `Tournaments.scan`.
+    async def scan(self, cursor, state = None, tournament_type = None, subdomain = None, split_above = 500, concurrency = 4):
+        _count('concurrency', concurrency)
+
+        running = {}
+        try:
+            while cursor.pending or running:
+                for window in cursor.pending:
+                    if len(running) >= concurrency:
+                        break
+                    if window not in running.values():
+                        created_after, created_before = cursor.bounds(window)
+                        task = asyncio.ensure_future(self.get_all(state, tournament_type, created_after, created_before, subdomain))
+                        running[task] = window
+
+                done, _ = await asyncio.wait(running, return_when = asyncio.FIRST_COMPLETED)
+                for task in done:
+                    window = running.pop(task)
+                    try:
+                        tournaments = task.result()
+                    except Exception as e:
+                        if _is_timeout(e) and cursor.split(window):
+                            continue
+                        raise
+
+                    if len(tournaments) >= split_above and cursor.split(window):
+                        continue
+
+                    for tournament in cursor.unseen(tournaments):
+                        yield tournament
+                        cursor.seen_ids.add(tournament.id)
+                    cursor.complete(window)
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def get(self, id, include_participants = False, include_matches = False):
+        data = {
+            "include_participants": int(include_participants),
+            "include_matches": int(include_matches)
+        }
 
-        if pts_for_game_tie is not None:
-            if not (isinstance(pts_for_game_tie, int) or isinstance(pts_for_game_tie, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                pts_for_game_tie = round(float(pts_for_game_tie), 1)
-                data['pts_for_game_tie'] = pts_for_game_tie
+        return await self.http.request('GET', f"tournaments/{id}.json", _prepare_params(data), hydrate = self._wrap)
 
-        if rr_pts_for_match_win is not None:
-            if not (isinstance(rr_pts_for_match_win, int) or isinstance(rr_pts_for_match_win, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                rr_pts_for_match_win = round(float(rr_pts_for_match_win), 1)
-                data['rr_pts_for_match_win'] = rr_pts_for_match_win
+    # See `Tournaments.get_many`.
+    async def get_many(self, ids, include_participants = False, include_matches = False, concurrency = 10):
+        _count('concurrency', concurrency)
 
-        if rr_pts_for_match_tie is not None:
-            if not (isinstance(rr_pts_for_match_tie, int) or isinstance(rr_pts_for_match_tie, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                rr_pts_for_match_tie = round(float(rr_pts_for_match_tie), 1)
-                data['rr_pts_for_match_tie'] = rr_pts_for_match_tie
+        semaphore = asyncio.Semaphore(concurrency)
 
-        if rr_pts_for_game_win is not None:
-            if not (isinstance(rr_pts_for_game_win, int) or isinstance(rr_pts_for_game_win, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                rr_pts_for_game_win = round(float(rr_pts_for_game_win), 1)
-                data['rr_pts_for_game_win'] = rr_pts_for_game_win
+        async def fetch(id):
+            async with semaphore:
+                try:
+                    return await self.get(id, include_participants, include_matches)
+                except HTTPException as e:
+                    return e
 
-        if rr_pts_for_game_tie is not None:
-            if not (isinstance(rr_pts_for_game_tie, int) or isinstance(rr_pts_for_game_tie, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                rr_pts_for_game_tie = round(float(rr_pts_for_game_tie), 1)
-                data['rr_pts_for_game_tie'] = rr_pts_for_game_tie
+        return await asyncio.gather(*[fetch(id) for id in ids])
 
-        if pts_for_bye is not None:
-            if not (isinstance(pts_for_bye, int) or isinstance(pts_for_bye, float)):
-                raise BadArgument('Parameter `pts_for_bye` must be of type int or float')
-            else:
-                pts_for_bye = round(float(pts_for_bye), 1)
-                data['pts_for_bye'] = pts_for_bye
+    # Accepts the same arguments as `Tournaments.create`.
+    async def create(self, name, url, *args, **kwargs):
+        data = _new_tournament_settings(name, url, *args, **kwargs)
 
-        if swiss_rounds is not None:
-            if not isinstance(swiss_rounds, int):
-                raise BadArgument('Parameter `swiss_rounds` must be of type int')
-            else:
-                data['swiss_rounds'] = swiss_rounds
+        return await self.http.request('POST', "tournaments.json", _prepare_params(data, 'tournament'), hydrate = self._wrap)
 
-        if ranked_by is not None:
-            if not isinstance(ranked_by, TournamentRankedBy):
+    # See `Tournaments.create_many`.
+    async def create_many(self, payloads, concurrency = 10):
+        _count('concurrency', concurrency)
+        batch = _new_tournaments_params(payloads)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def create(params):
+            async with semaphore:
                 try:
-                    ranked_by = TournamentRankedBy(ranked_by)
-                except:
-                    raise BadArgument(f"Parameter `ranked_by` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(TournamentRankedBy)])}")
-                else:
-                    data['ranked_by'] = ranked_by
-            else:
-                data['ranked_by'] = ranked_by
+                    return await self.http.request('POST', "tournaments.json", params, hydrate = self._wrap)
+                except HTTPException as e:
+                    return e
 
-        if accept_attachments is not None:
-            if not isinstance(accept_attachments, bool):
-                raise BadArgument('Parameter `accept_attachments` must be of type bool')
-            else:
-                data['accept_attachments'] = accept_attachments
+        return await asyncio.gather(*[create(params) for params in batch])
 
-        if hide_forum is not None:
-            if not isinstance(hide_forum, bool):
-                raise BadArgument('Parameter `hide_forum` must be of type bool')
-            else:
-                data['hide_forum'] = hide_forum
+    # See `Tournaments.start_many`.
+    async def start_many(self, tournaments, include_participants = False, include_matches = False, concurrency = 10, stop_on_failure = False):
+        return await self._act_many('start', tournaments, include_participants, include_matches, concurrency, stop_on_failure)
 
-        if show_rounds is not None:
-            if not isinstance(show_rounds, bool):
-                raise BadArgument('Parameter `show_rounds` must be of type bool')
-            else:
-                data['show_rounds'] = show_rounds
+    async def finalize_many(self, tournaments, include_participants = False, include_matches = False, concurrency = 10, stop_on_failure = False):
+        return await self._act_many('finalize', tournaments, include_participants, include_matches, concurrency, stop_on_failure)
 
-        if private is not None:
-            if not isinstance(private, bool):
-                raise BadArgument('Parameter `private` must be of type bool')
-            else:
-                data['private'] = private
+    async def reset_many(self, tournaments, include_participants = False, include_matches = False, concurrency = 10, stop_on_failure = False):
+        return await self._act_many('reset', tournaments, include_participants, include_matches, concurrency, stop_on_failure)
 
-        if notify_users_when_matches_open is not None:
-            if not isinstance(notify_users_when_matches_open, bool):
-                raise BadArgument('Parameter `notify_users_when_matches_open` must be of type bool')
-            else:
-                data['notify_users_when_matches_open'] = notify_users_when_matches_open
+    async def process_check_ins_many(self, tournaments, include_participants = False, include_matches = False, concurrency = 10, stop_on_failure = False):
+        return await self._act_many('process_check_ins', tournaments, include_participants, include_matches, concurrency, stop_on_failure)
 
-        if notify_users_when_the_tournament_ends is not None:
-            if not isinstance(notify_users_when_the_tournament_ends, bool):
-                raise BadArgument('Parameter `notify_users_when_the_tournament_ends` must be of type bool')
+    # See `Tournaments.delete_many`.
+    async def delete_many(self, tournaments, concurrency = 10, stop_on_failure = False):
+        async def delete(tournament):
+            if isinstance(tournament, Tournament):
+                await tournament.delete()
             else:
-                data['notify_users_when_the_tournament_ends'] = notify_users_when_the_tournament_ends
+                await self.http.request('DELETE', f"tournaments/{tournament}.json")
+            return tournament
 
-        if sequential_pairings is not None:
-            if not isinstance(sequential_pairings, bool):
-                raise BadArgument('Parameter `sequential_pairings` must be of type bool')
-            else:
-                data['sequential_pairings'] = sequential_pairings
+        return await self._run_many(delete, _tournaments(tournaments), concurrency, stop_on_failure)
 
-        if signup_cap is not None:
-            if isinstance(signup_cap, int):
-                raise BadArgument('Parameter `signup_cap` must be of type int')
-            elif signup_cap > 256 or signup_cap < 1:
-                raise BadArgument('Parameter `signup_cap` must be between the values 1 and 256')
-            else:
-                data['signup_cap'] = signup_cap
+    async def _act_many(self, action, tournaments, include_participants, include_matches, concurrency, stop_on_failure):
+        params = _action_params(include_participants, include_matches)
 
-        if check_in_duration is not None:
-            if not isinstance(check_in_duration, int):
-                raise BadArgument('Parameter `check_in_duration` must be of type int')
-            else:
-                data['check_in_duration'] = check_in_duration
+        async def act(tournament):
+            if isinstance(tournament, Tournament):
+                await tournament._action(action, include_participants, include_matches)
+                return tournament
+            return await self.http.request('POST', f"tournaments/{tournament}/{action}.json", params, hydrate = self._wrap)
 
-        if grand_finals_modifier is not None:
-            if not isinstance(grand_finals_modifier, TournamentGrandFinalModifier):
-                try:
-                    grand_finals_modifier = TournamentGrandFinalModifier(grand_finals_modifier)
-                except:
-                    raise BadArgument(f"Parameter `grand_finals_modifier` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(TournamentGrandFinalModifier)])}")
-                else:
-                    data['grand_finals_modifier'] = grand_finals_modifier
-            else:
-                data['grand_finals_modifier'] = grand_finals_modifier
+        return await self._run_many(act, _tournaments(tournaments), concurrency, stop_on_failure)
 
+    # See `Tournaments._run_many`; `run` is a coroutine function.
+    async def _run_many(self, run, items, concurrency, stop_on_failure):
+        _count('concurrency', concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        failed = False
 
-        url_params = '?' + urlencode(_prepare_params(data, 'tournament'))
+        async def attempt(item):
+            nonlocal failed
+            async with semaphore:
+                if failed:
+                    return None
+                try:
+                    return await run(item)
+                except HTTPException as e:
+                    if stop_on_failure:
+                        failed = True
+                    return e
 
-        req = requests.post(req_url + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            try:
-                errors = req.json()
-                raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-            except:
-                raise HTTPException(req.status_code)
-        else:
-            return Tournament(req.json(), self.base_link, self.auth_info)
+        return await asyncio.gather(*[attempt(i) for i in items])
 
 # An ovararching Challonge account object.
+#
+# The account owns one pooled HTTP session; `pool_size`, `timeout` (seconds, or a
+# `(connect, read)` tuple) and extra `headers` are fixed when the client is built.
+#
+# `rate_limit` (requests per second) and `burst` enable a token bucket shared by
+# every call made through this account. 429/502/503/504 responses are retried
+# (POSTs only on 429/503, as they may not be repeated safely) according to
+# `retry_policy`, a `RetryPolicy` (pass `RetryPolicy(max_retries = 0)` to
+# disable retries).
+#
+# Passing a `ResponseCache` as `cache` keeps GET responses and revalidates them
+# with conditional requests once they expire. `base_link` points the client at
+# another API root, such as a proxy or the mock server in `benchmarks/`.
+#
+# Identical GETs made while one is in flight (e.g. many threads polling the
+# same bracket) share its response; `coalesce = False` sends each of them.
+#
+# `instrument` is called with a `RequestRecord` (timings, bytes, retries and
+# models built) after every request. `RequestStats` aggregates them in
+# process; any callable taking a record works.
 class Challonge:
-    def __init__(self, username, api_key):
+    def __init__(self, username, api_key, pool_size = 10, timeout = None, headers = None,
+        rate_limit = None, burst = None, retry_policy = None, cache = None, base_link = BASE_LINK, instrument = None,
+        coalesce = True):
+        self.auth_info = (username, api_key)
+        self.base_link = base_link
+        self.http = HTTPClient(self.auth_info, self.base_link, pool_size = pool_size, timeout = timeout, headers = headers,
+            rate_limiter = _rate_limiter(rate_limit, burst), retry_policy = retry_policy, cache = cache,
+            instrument = instrument, coalesce = coalesce)
+        self.tournaments = Tournaments(self.http)
+
+    # Closes every pooled connection held by this client.
+    def close(self):
+        self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# The asyncio counterpart of `Challonge`. Requires `aiohttp`.
+#
+# Every call is awaitable and shares one aiohttp connection pool, so many
+# tournaments can be polled concurrently from a single event loop.
+class AsyncChallonge:
+    def __init__(self, username, api_key, pool_size = 100, timeout = None, headers = None,
+        rate_limit = None, burst = None, retry_policy = None, cache = None, base_link = BASE_LINK, instrument = None,
+        coalesce = True):
+        from _async_http import AsyncHTTPClient
+
         self.auth_info = (username, api_key)
-        self.base_link = BASE_LINK
-        self.tournaments = Tournaments(self.auth_info)
+        self.base_link = base_link
+        self.http = AsyncHTTPClient(self.auth_info, self.base_link, pool_size = pool_size, timeout = timeout, headers = headers,
+            rate_limiter = _rate_limiter(rate_limit, burst), retry_policy = retry_policy, cache = cache,
+            instrument = instrument, coalesce = coalesce)
+        self.tournaments = AsyncTournaments(self.http)
+
+    async def close(self):
+        await self.http.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+# Validates the targets of a bulk lifecycle call before anything is sent.
+def _tournaments(tournaments):
+    tournaments = list(tournaments)
+    for i in tournaments:
+        if not isinstance(i, (Tournament, int, str)):
+            raise BadArgument('Every tournament must be a `Tournament`, an ID or a url')
+    return tournaments
+
+def _action_params(include_participants, include_matches):
+    return _prepare_params({
+        "include_participants": int(include_participants),
+        "include_matches": int(include_matches)
+    })
+
+def _rate_limiter(rate_limit, burst):
+    if rate_limit is None:
+        return None
+    if not isinstance(rate_limit, (int, float)) or rate_limit <= 0:
+        raise BadArgument('Parameter `rate_limit` must be a positive int or float')
+    return TokenBucket(rate_limit, burst)
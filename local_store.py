@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import threading
+
+from _data_management import _parse_datetime, _match_state
+from _enums import MatchState
+from _errors import *
+from match import Match
+from tournament import Tournament
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    state TEXT,
+    created_at REAL,
+    updated_at REAL,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tournaments_state_created_at ON tournaments (state, created_at);
+CREATE INDEX IF NOT EXISTS tournaments_created_at ON tournaments (created_at);
+
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    tournament_id INTEGER NOT NULL,
+    state TEXT,
+    round INTEGER,
+    player1_id INTEGER,
+    player2_id INTEGER,
+    updated_at REAL,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_tournament_state ON matches (tournament_id, state);
+CREATE INDEX IF NOT EXISTS matches_state_round ON matches (state, round);
+CREATE INDEX IF NOT EXISTS matches_player1 ON matches (player1_id, state);
+CREATE INDEX IF NOT EXISTS matches_player2 ON matches (player2_id, state);
+"""
+
+
+# A local SQLite mirror of tournaments and matches.
+#
+# Records are stored as their raw API payload next to indexed columns, fed by
+# `upsert_tournaments` / `upsert_matches` with objects returned by the usual
+# fetch calls. Queries return the same `Tournament` and `Match` objects, bound
+# to `http` (e.g. `Challonge.http`) so their actions still work.
+# Timestamps are filtered as `datetime.datetime` objects.
+class TournamentStore:
+    def __init__(self, path, http):
+        self.http = http
+        self.connection = sqlite3.connect(path, check_same_thread = False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    # Inserts or replaces tournaments, along with any matches they were fetched
+    # with. Local changes, such as those made by `update`, are stored too.
+    def upsert_tournaments(self, tournaments):
+        tournament_rows = []
+        match_rows = []
+        for tournament in tournaments:
+            raw = {i: j for i, j in tournament._raw.items() if i not in ('matches', 'participants')}
+            raw.update(tournament.to_dict())
+            tournament_rows.append((raw['id'], raw['state'], _timestamp(raw['created_at']), _timestamp(raw['updated_at']), json.dumps(raw)))
+            match_rows.extend(_match_row(i) for i in tournament.matches)
+
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO tournaments VALUES (?, ?, ?, ?, ?)", tournament_rows)
+            self.connection.executemany("INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?)", match_rows)
+
+    def upsert_matches(self, matches):
+        rows = [_match_row(i) for i in matches]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def tournament(self, id):
+        rows = self._query("SELECT raw FROM tournaments WHERE id = ?", (id,))
+        return Tournament({"tournament": json.loads(rows[0][0])}, self.http) if rows else None
+
+    def tournaments(self, state = None, created_after = None, created_before = None):
+        conditions, params = [], []
+        if state is not None:
+            conditions.append("state = ?")
+            params.append(state)
+        if created_after is not None:
+            conditions.append("created_at >= ?")
+            params.append(created_after.timestamp())
+        if created_before is not None:
+            conditions.append("created_at < ?")
+            params.append(created_before.timestamp())
+
+        rows = self._query("SELECT raw FROM tournaments" + _where(conditions) + " ORDER BY created_at", params)
+        return [Tournament({"tournament": json.loads(i[0])}, self.http) for i in rows]
+
+    # Matches across every stored tournament. `participant_id` matches either
+    # player slot; `created_after`/`created_before` filter on the tournament.
+    def matches(self, tournament_id = None, state = None, participant_id = None, round = None,
+        created_after = None, created_before = None):
+        conditions, params = [], []
+        if tournament_id is not None:
+            conditions.append("m.tournament_id = ?")
+            params.append(tournament_id)
+        state = _stored_state(state)
+        if state is not None:
+            conditions.append("m.state = ?")
+            params.append(state)
+        if round is not None:
+            conditions.append("m.round = ?")
+            params.append(round)
+        if created_after is not None:
+            conditions.append("t.created_at >= ?")
+            params.append(created_after.timestamp())
+        if created_before is not None:
+            conditions.append("t.created_at < ?")
+            params.append(created_before.timestamp())
+
+        join = " JOIN tournaments t ON t.id = m.tournament_id" if created_after or created_before else ""
+        query = "SELECT m.raw FROM matches m" + join
+
+        # Two indexed lookups combined with UNION are far cheaper than an OR
+        # across both player columns, which SQLite cannot serve from one index.
+        if participant_id is not None:
+            query = (query + _where(conditions + ["m.player1_id = ?"]) + " UNION "
+                + query + _where(conditions + ["m.player2_id = ?"]))
+            params = params + [participant_id] + params + [participant_id]
+        else:
+            query += _where(conditions)
+
+        return [Match({"match": json.loads(i[0])}, self.http) for i in self._query(query, params)]
+
+    def close(self):
+        self.connection.close()
+
+    def _query(self, query, params):
+        with self.lock:
+            return self.connection.execute(query, params).fetchall()
+
+
+# The row of a `Match`, including any changes made to it since it was fetched.
+def _match_row(match):
+    raw = {**match._raw, **match.to_dict()}
+    return (raw['id'], raw['tournament_id'], raw['state'], raw['round'], raw['player1_id'], raw['player2_id'],
+        _timestamp(raw['updated_at']), json.dumps(raw))
+
+# The stored value of a state filter, or None for `MatchState.all` (no filter).
+def _stored_state(state):
+    if state is None:
+        return None
+    state = _match_state(state)
+    return None if state == MatchState.all else state.value
+
+def _timestamp(value):
+    return _parse_datetime(value).timestamp() if value else None
+
+def _where(conditions):
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
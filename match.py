@@ -1,70 +1,96 @@
-import datetime
+from _data_management import _prepare_params, _parse_datetime, _match_settings
 from _enums import MatchState
+from _errors import *
+from _fields import compile_hydrator, compile_dehydrator
+
+# Every attribute of a match, as (attribute, raw key, decoder).
+MATCH_FIELDS = (
+    ('attachment_count', 'attachment_count', None),
+    ('created_at', 'created_at', _parse_datetime),
+    ('group_id', 'group_id', None),
+    ('has_attachment', 'has_attachment', None),
+    ('id', 'id', None),
+    ('identifier', 'identifier', None),
+    ('location', 'location', None),
+    ('loser_id', 'loser_id', None),
+    ('player1_id', 'player1_id', None),
+    ('player1_is_prereq_match_loser', 'player1_is_prereq_match_loser', None),
+    ('player1_prereq_match_id', 'player1_prereq_match_id', None),
+    ('player1_votes', 'player1_votes', None),
+    ('player2_id', 'player2_id', None),
+    ('player2_is_prereq_match_loser', 'player2_is_prereq_match_loser', None),
+    ('player2_prereq_match_id', 'player2_prereq_match_id', None),
+    ('player2_votes', 'player2_votes', None),
+    ('round', 'round', None),
+    ('scheduled_time', 'scheduled_time', _parse_datetime),
+    ('started_at', 'started_at', _parse_datetime),
+    ('state', 'state', MatchState),
+    ('tournament_id', 'tournament_id', None),
+    ('underway_at', 'underway_at', _parse_datetime),
+    ('updated_at', 'updated_at', _parse_datetime),
+    ('winner_id', 'winner_id', None),
+    ('prerequisite_match_ids_csv', 'prerequisite_match_ids_csv', None),
+    ('scores_csv', 'scores_csv', None)
+)
+
+_hydrate = compile_hydrator(MATCH_FIELDS)
+_dehydrate = compile_dehydrator(MATCH_FIELDS)
 
 class Match:
-    def __init__(self, raw_match_data, base_api_link, auth_info):
+    def __init__(self, raw_match_data, http):
+        self.http = http
+        self.base_api_link = http.base_link
+        self.auth_info = http.auth_info
+        self._load(raw_match_data)
+
+    # Sets every attribute from a raw match payload, e.g. the response to an update.
+    def _load(self, raw_match_data):
         raw_match_data = raw_match_data['match']
+        self._raw = raw_match_data
+        _hydrate(self, raw_match_data)
+        return self
+
+    # The raw payload of this match, with any local changes. `Match({'match': match.to_dict()}, http)` is a copy.
+    def to_dict(self):
+        return _dehydrate(self.__dict__, self._raw)
+
+    def _path(self, action = None):
+        path = f"tournaments/{self.tournament_id}/matches/{self.id}"
+        return f"{path}/{action}.json" if action else f"{path}.json"
+
+    # Reports a result. `scores_csv` is a string such as "3-1,2-3" or a list of
+    # (player 1, player 2) score pairs; `winner_id` may also be "tie".
+    def update(self, scores_csv = None, winner_id = None, player1_votes = None, player2_votes = None):
+        data = _match_settings(scores_csv, winner_id, player1_votes, player2_votes)
+        if len(data.keys()) == 0:
+            raise UserInputError()
+
+        self.http.request('PUT', self._path(), _prepare_params(data, 'match'), hydrate = self._load)
+
+    def mark_underway(self):
+        self.http.request('POST', self._path('mark_as_underway'), hydrate = self._load)
+
+    def unmark_underway(self):
+        self.http.request('POST', self._path('unmark_as_underway'), hydrate = self._load)
+
+    # Reopens a completed match, resetting the matches that depend on it.
+    def reopen(self):
+        self.http.request('POST', self._path('reopen'), hydrate = self._load)
+
+# A Match whose actions are awaitable. Created by `AsyncMatches` and `AsyncTournament`.
+class AsyncMatch(Match):
+    async def update(self, scores_csv = None, winner_id = None, player1_votes = None, player2_votes = None):
+        data = _match_settings(scores_csv, winner_id, player1_votes, player2_votes)
+        if len(data.keys()) == 0:
+            raise UserInputError()
+
+        await self.http.request('PUT', self._path(), _prepare_params(data, 'match'), hydrate = self._load)
+
+    async def mark_underway(self):
+        await self.http.request('POST', self._path('mark_as_underway'), hydrate = self._load)
+
+    async def unmark_underway(self):
+        await self.http.request('POST', self._path('unmark_as_underway'), hydrate = self._load)
 
-        self.base_api_link = base_api_link
-        self.auth_info = auth_info
-
-        self.attachment_count = raw_match_data['attachment_count']
-
-        if raw_match_data['created_at']:
-            split_date = raw_match_data['created_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.created_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.created_at = raw_match_data['created_at']
-
-        self.group_id = raw_match_data['group_id']
-        self.has_attachment = raw_match_data['has_attachment']
-        self.id = raw_match_data['id']
-        self.identifier = raw_match_data['identifier']
-        self.location = raw_match_data['location']
-        self.loser_id = raw_match_data['loser_id']
-        self.player1_id = raw_match_data['player1_id']
-        self.player1_is_prereq_match_loser = raw_match_data['player1_is_prereq_match_loser']
-        self.player1_prereq_match_id = raw_match_data['player1_prereq_match_id']
-        self.player1_votes = raw_match_data['player1_votes']
-        self.player2_id = raw_match_data['player2_id']
-        self.player2_is_prereq_match_loser = raw_match_data['player2_is_prereq_match_loser']
-        self.player2_prereq_match_id = raw_match_data['player2_prereq_match_id']
-        self.player2_votes = raw_match_data['player2_votes']
-        self.round = raw_match_data['round']
-
-        if raw_match_data['scheduled_time']:
-            split_date = raw_match_data['scheduled_time'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.scheduled_time = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.scheduled_time = raw_match_data['scheduled_time']
-
-        if raw_match_data['started_at']:
-            split_date = raw_match_data['started_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.started_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.started_at = raw_match_data['started_at']
-
-        self.state = MatchState(raw_match_data['state'])
-
-        self.tournament_id = raw_match_data['tournament_id']
-
-        if raw_match_data['underway_at']:
-            split_date = raw_match_data['underway_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.underway_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.underway_at = raw_match_data['underway_at']
-
-        if raw_match_data['updated_at']:
-            split_date = raw_match_data['updated_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.updated_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.updated_at = raw_match_data['updated_at']
-
-        self.winnder_id = raw_match_data['winnder_id']
-        self.prerequisite_match_ids_csv = raw_match_data['prerequisite_match_ids_csv']
-        self.scores_csv = raw_match_data['scores_csv']
+    async def reopen(self):
+        await self.http.request('POST', self._path('reopen'), hydrate = self._load)
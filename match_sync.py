@@ -0,0 +1,136 @@
+import asyncio
+
+from _enums import MatchState
+
+
+# Base class of every event emitted by `MatchSync`.
+# `previous` is the last known version of the match, or None if it is new.
+class MatchEvent:
+    def __init__(self, match, previous):
+        self.match = match
+        self.previous = previous
+
+    def __repr__(self):
+        return f"<{type(self).__name__} match={self.match.id}>"
+
+# The match became playable.
+class MatchOpened(MatchEvent):
+    pass
+
+# The match's `scores_csv` changed.
+class MatchScoreChanged(MatchEvent):
+    pass
+
+# The match was completed.
+class MatchCompleted(MatchEvent):
+    pass
+
+# A completed match was reopened.
+class MatchReopened(MatchEvent):
+    pass
+
+
+# Keeps the last known matches of one tournament, keyed by id, and turns each
+# poll into events describing only what changed.
+#
+# Matches whose `updated_at` did not move since the last poll are skipped
+# before a `Match` is even built, so the work done per poll is proportional to
+# the number of changed matches. `watermark` is the newest `updated_at` seen.
+# On the first poll every open or completed match is reported as new.
+#
+# Events are passed to the callbacks registered with `on`.
+class MatchSync:
+    def __init__(self, matches):
+        self.tournament_matches = matches
+        self.http = matches.http
+        self.matches = {}
+        self.watermark = None
+        self._updated_at = {}
+        self._callbacks = []
+
+    # Calls `callback(event)` for every event of the given type (all events by default).
+    def on(self, callback, event_type = MatchEvent):
+        self._callbacks.append((event_type, callback))
+        return callback
+
+    # Fetches the tournament's matches and applies them. Returns the emitted events.
+    def poll(self):
+        return self.apply(self.tournament_matches._fetch())
+
+    # Applies a full raw `matches.json` payload as a delta against the known matches.
+    def apply(self, raw_matches):
+        events = []
+        for raw_match in raw_matches:
+            match_data = raw_match['match']
+            updated_at = match_data['updated_at']
+            if self._updated_at.get(match_data['id']) == updated_at:
+                continue
+
+            match = self.tournament_matches._match_class(raw_match, self.http)
+            previous = self.matches.get(match.id)
+            self.matches[match.id] = match
+            self._updated_at[match.id] = updated_at
+            if match.updated_at and (self.watermark is None or match.updated_at > self.watermark):
+                self.watermark = match.updated_at
+
+            events.extend(_diff(match, previous))
+
+        for event in events:
+            self._emit(event)
+        return events
+
+    def _emit(self, event):
+        for event_type, callback in self._callbacks:
+            if isinstance(event, event_type):
+                callback(event)
+
+
+# The asyncio counterpart of `MatchSync`, built from `AsyncMatches`.
+# Events can also be consumed with `async for event in sync.events()`.
+class AsyncMatchSync(MatchSync):
+    def __init__(self, matches):
+        super().__init__(matches)
+        self._queues = []
+
+    async def poll(self):
+        return self.apply(await self.tournament_matches._fetch())
+
+    # Polls every `interval` seconds until cancelled.
+    async def run(self, interval):
+        while True:
+            await self.poll()
+            await asyncio.sleep(interval)
+
+    # An async iterator over every event emitted from now on.
+    async def events(self):
+        queue = asyncio.Queue()
+        self._queues.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+    def _emit(self, event):
+        super()._emit(event)
+        for queue in self._queues:
+            queue.put_nowait(event)
+
+
+def _diff(match, previous):
+    events = []
+    previous_state = previous.state if previous else None
+
+    if match.state == MatchState.open and not previous_state == MatchState.open:
+        if previous_state == MatchState.complete:
+            events.append(MatchReopened(match, previous))
+        else:
+            events.append(MatchOpened(match, previous))
+    elif match.state == MatchState.complete and not previous_state == MatchState.complete:
+        events.append(MatchCompleted(match, previous))
+    elif previous_state == MatchState.complete and not match.state == MatchState.complete:
+        events.append(MatchReopened(match, previous))
+
+    if previous and not match.scores_csv == previous.scores_csv:
+        events.insert(0, MatchScoreChanged(match, previous))
+    return events
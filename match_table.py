@@ -0,0 +1,138 @@
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from _data_management import _parse_datetime, _match_state
+from _enums import MatchState
+from _errors import *
+from match import Match
+
+
+# Small integer codes stored in the `state` column, in `MatchState` order.
+STATE_CODES = {state: code for code, state in enumerate(MatchState)}
+_STATE_CODES_BY_VALUE = {state.value: code for state, code in STATE_CODES.items()}
+
+INT_COLUMNS = ('id', 'tournament_id', 'player1_id', 'player2_id', 'winner_id', 'loser_id', 'round')
+TIME_COLUMNS = ('created_at', 'updated_at', 'started_at', 'underway_at')
+
+
+# A columnar view over a list of raw match payloads.
+#
+# Each column is one typed array (a NumPy array when NumPy is installed, an
+# `array.array` otherwise) so large brackets can be filtered and grouped
+# without building a `Match` per row. Missing ids and rounds are stored as 0,
+# missing timestamps as NaN (seconds since the epoch otherwise), and `state`
+# as its code from `STATE_CODES`. Rows become `match_class` objects (`Match`
+# by default) on demand.
+class MatchTable:
+    def __init__(self, raw_matches, http, match_class = Match):
+        self.http = http
+        self.match_class = match_class
+        self._raw = list(raw_matches)
+
+        ints = {i: [] for i in INT_COLUMNS}
+        times = {i: [] for i in TIME_COLUMNS}
+        states = []
+        for raw_match in self._raw:
+            raw_match = raw_match['match']
+            for i in INT_COLUMNS:
+                ints[i].append(raw_match[i] or 0)
+            for i in TIME_COLUMNS:
+                value = raw_match[i]
+                times[i].append(_parse_datetime(value).timestamp() if value else float('nan'))
+            states.append(_STATE_CODES_BY_VALUE.get(raw_match['state'], 0))
+
+        self.columns = {i: _column(j, 'q') for i, j in ints.items()}
+        self.columns.update({i: _column(j, 'd') for i, j in times.items()})
+        self.columns['state'] = _column(states, 'q')
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __iter__(self):
+        for i in range(len(self._raw)):
+            yield self.row(i)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    # Builds the `Match` for row `index`.
+    def row(self, index):
+        return self.match_class(self._raw[index], self.http)
+
+    # A new table holding only the given rows, in the given order.
+    def take(self, indices):
+        table = MatchTable.__new__(MatchTable)
+        table.http = self.http
+        table.match_class = self.match_class
+        table._raw = [self._raw[i] for i in indices]
+        if numpy is not None:
+            indices = numpy.asarray(indices, dtype = numpy.intp)
+            table.columns = {i: j[indices] for i, j in self.columns.items()}
+        else:
+            table.columns = {i: array.array(j.typecode, (j[k] for k in indices)) for i, j in self.columns.items()}
+        return table
+
+    # Rows matching every given condition. `player_id` matches either player
+    # slot and `MatchState.all` does not filter on the state.
+    def filter(self, state = None, round = None, player_id = None):
+        if state is not None:
+            state = _match_state(state)
+
+        conditions = []
+        if state is not None and not state == MatchState.all:
+            conditions.append(('state', STATE_CODES[state]))
+        if round is not None:
+            conditions.append(('round', round))
+
+        if numpy is not None:
+            mask = numpy.ones(len(self), dtype = bool)
+            for column, value in conditions:
+                mask &= self.columns[column] == value
+            if player_id is not None:
+                mask &= (self.columns['player1_id'] == player_id) | (self.columns['player2_id'] == player_id)
+            return self.take(numpy.flatnonzero(mask))
+
+        indices = range(len(self))
+        for column, value in conditions:
+            values = self.columns[column]
+            indices = [i for i in indices if values[i] == value]
+        if player_id is not None:
+            player1, player2 = self.columns['player1_id'], self.columns['player2_id']
+            indices = [i for i in indices if player1[i] == player_id or player2[i] == player_id]
+        return self.take(indices)
+
+    # Splits the table into one sub-table per distinct value of `column`.
+    def group_by(self, column):
+        groups = {}
+        if numpy is not None:
+            values, inverse = numpy.unique(self.columns[column], return_inverse = True)
+            order = numpy.argsort(inverse, kind = 'stable')
+            bounds = numpy.cumsum(numpy.bincount(inverse, minlength = len(values)))[:-1]
+            for value, indices in zip(values.tolist(), numpy.split(order, bounds)):
+                groups[value] = self.take(indices)
+            return groups
+
+        for i, value in enumerate(self.columns[column]):
+            groups.setdefault(value, []).append(i)
+        return {i: self.take(j) for i, j in groups.items()}
+
+    # The number of rows for each distinct value of `column`.
+    def count_by(self, column):
+        if numpy is not None:
+            values, counts = numpy.unique(self.columns[column], return_counts = True)
+            return dict(zip(values.tolist(), counts.tolist()))
+
+        counts = {}
+        for value in self.columns[column]:
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+
+def _column(values, typecode):
+    if numpy is not None:
+        return numpy.array(values, dtype = numpy.int64 if typecode == 'q' else numpy.float64)
+    return array.array(typecode, values)
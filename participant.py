@@ -1,3 +1,49 @@
+from _data_management import _parse_datetime
+from _fields import LazyField, model_fields, compile_dehydrator
+
+# A participant of a tournament.
 class Participant:
-    def __init__(self):
-        pass
+    __slots__ = ('http', '_raw', '_values')
+
+    active = LazyField('active')
+    checked_in_at = LazyField('checked_in_at', _parse_datetime)
+    created_at = LazyField('created_at', _parse_datetime)
+    final_rank = LazyField('final_rank')
+    group_id = LazyField('group_id')
+    icon = LazyField('icon')
+    id = LazyField('id')
+    invitation_id = LazyField('invitation_id')
+    invite_email = LazyField('invite_email')
+    misc = LazyField('misc')
+    name = LazyField('name')
+    on_waiting_list = LazyField('on_waiting_list')
+    seed = LazyField('seed')
+    tournament_id = LazyField('tournament_id')
+    updated_at = LazyField('updated_at', _parse_datetime)
+    challonge_username = LazyField('challonge_username')
+    challonge_email_address_verified = LazyField('challonge_email_address_verified')
+    removable = LazyField('removable')
+    participatable_or_invitation_attached = LazyField('participatable_or_invitation_attached')
+    confirm_remove = LazyField('confirm_remove')
+    invitation_pending = LazyField('invitation_pending')
+    display_name_with_invitation_email_address = LazyField('display_name_with_invitation_email_address')
+    email_hash = LazyField('email_hash')
+    username = LazyField('username')
+    attached_participatable_portrait_url = LazyField('attached_participatable_portrait_url')
+    can_check_in = LazyField('can_check_in')
+    checked_in = LazyField('checked_in')
+    reactivatable = LazyField('reactivatable')
+    check_in_open = LazyField('check_in_open')
+    group_player_ids = LazyField('group_player_ids')
+    has_irrelevant_seed = LazyField('has_irrelevant_seed')
+
+    def __init__(self, raw_participant_data, http):
+        self.http = http
+        self._raw = raw_participant_data['participant']
+        self._values = {}
+
+    # The raw payload of this participant, with any local changes.
+    def to_dict(self):
+        return _dehydrate(self._values, self._raw)
+
+_dehydrate = compile_dehydrator(model_fields(Participant))
@@ -0,0 +1,212 @@
+import asyncio
+import datetime
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _errors import *
+from _rate_limit import TokenBucket
+
+
+# Challonge tournament states, grouped by how often they are worth polling.
+LIVE_STATES = ('underway', 'awaiting_review', 'group_stages_underway', 'group_stages_finalized')
+CHECK_IN_STATES = ('checking_in', 'checked_in')
+FINISHED_STATES = ('complete', 'ended')
+
+
+# Polls many tournaments, each at an interval adapted to how live it is.
+#
+# Finished tournaments are polled every `max_interval` seconds and pending
+# ones rarely until their `start_at` or check-in approaches. Live brackets are
+# fetched with their matches and polled every `min_interval` seconds while
+# their matches keep changing, backing off gradually while they are quiet.
+# Whenever the intervals together would exceed `budget` requests per second,
+# all of them are stretched by the same factor to stay under it, and polls
+# that are due while the budget is spent wait for the next free slot.
+#
+# After every poll the callbacks registered with `on` are called with the
+# tournament and the list of `MatchEvent`s from its `MatchSync` (see `sync`).
+class PollScheduler:
+    def __init__(self, tournaments, budget = 1.0, min_interval = 5.0, max_interval = 900.0, concurrency = 4):
+        if not isinstance(budget, (int, float)) or budget <= 0:
+            raise BadArgument('Parameter `budget` must be a positive int or float')
+
+        self.tournaments = tournaments
+        self.budget = budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.concurrency = concurrency
+
+        self.latest = {}
+        self.syncs = {}
+        self._due = {}
+        self._queue = []
+        self._intervals = {}
+        self._quiet_polls = {}
+        self._demand = 0.0
+        self._admitted_until = 0.0
+        self._bucket = TokenBucket(budget, max(1, budget))
+        self._callbacks = []
+
+    # Starts watching a tournament. First polls are spread out at the budget
+    # rate, so adding hundreds of tournaments at once does not burst.
+    def add(self, id):
+        if id not in self._due:
+            self._quiet_polls[id] = 0
+            self._admitted_until = max(self._admitted_until, time.monotonic())
+            self._due[id] = self._admitted_until
+            heapq.heappush(self._queue, (self._admitted_until, id))
+            self._admitted_until += 1 / self.budget
+
+    def remove(self, id):
+        self._due.pop(id, None)
+        self._demand -= 1 / self._intervals.pop(id, float('inf'))
+        for i in (self.latest, self.syncs, self._quiet_polls):
+            i.pop(id, None)
+
+    # Calls `callback(tournament, events)` after every successful poll.
+    def on(self, callback):
+        self._callbacks.append(callback)
+        return callback
+
+    # The `MatchSync` of a live tournament, once it has been polled with its matches.
+    def sync(self, id):
+        return self.syncs.get(id)
+
+    # Seconds until the next poll of a tournament, before scaling to the budget.
+    def interval(self, tournament):
+        if tournament.state in FINISHED_STATES:
+            return self.max_interval
+
+        if tournament.state in LIVE_STATES or 0 < (tournament.progress_meter or 0) < 100:
+            quiet = self._quiet_polls.get(tournament.id, 0)
+            return min(self.min_interval * 1.5 ** quiet, self.max_interval / 10)
+
+        if tournament.state in CHECK_IN_STATES:
+            return self.min_interval * 2
+
+        upcoming = [i for i in (tournament.start_at, tournament.started_checking_in_at) if i]
+        if not upcoming:
+            return self.max_interval
+
+        seconds = (min(upcoming) - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return min(max(seconds / 4, self.min_interval * 2), self.max_interval)
+
+    # Polls every tournament that is due, `concurrency` at a time. Returns the ids polled.
+    def step(self):
+        due = self._pop_due()
+        if due:
+            with ThreadPoolExecutor(max_workers = self.concurrency) as executor:
+                results = list(executor.map(self._poll, due))
+            for id, result in zip(due, results):
+                self._handle(id, result)
+        return due
+
+    # Polls until `stop` (a `threading.Event`) is set, sleeping until the next poll is due.
+    def run(self, stop = None):
+        while not (stop and stop.is_set()):
+            self.step()
+            delay = max(0.0, self._next_due() - time.monotonic())
+            if stop:
+                stop.wait(delay)
+            else:
+                time.sleep(delay)
+
+    # Returns the tournament, or the exception its poll failed with. Transport
+    # errors (timeouts, dropped connections) count as failures too, so one
+    # network blip cannot abort a step after its ids were taken off the queue.
+    def _poll(self, id):
+        try:
+            return self.tournaments.get(id, include_matches = self._is_live(id))
+        except Exception as e:
+            return e
+
+    def _is_live(self, id):
+        tournament = self.latest.get(id)
+        return tournament is not None and tournament.state in LIVE_STATES
+
+    def _pop_due(self):
+        now = time.monotonic()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            when, id = self._queue[0]
+            if self._due.get(id) == when:
+                if not self._bucket.try_acquire():
+                    break
+                due.append(id)
+            heapq.heappop(self._queue)
+        return due
+
+    def _next_due(self):
+        while self._queue and not self._due.get(self._queue[0][1]) == self._queue[0][0]:
+            heapq.heappop(self._queue)
+        if not self._queue:
+            return time.monotonic() + self.min_interval
+        return max(self._queue[0][0], time.monotonic() + 1 / self.budget / 2)
+
+    def _handle(self, id, result):
+        if id not in self._due:
+            return
+
+        # Failed polls keep their last interval, doubled, so a broken
+        # tournament cannot eat the budget of the others.
+        if isinstance(result, Exception):
+            self._schedule(id, min(self._intervals.get(id, self.min_interval) * 2, self.max_interval))
+            return
+
+        events = []
+        if 'matches' in result._raw:
+            sync = self.syncs.get(id)
+            if sync is None:
+                sync = self.syncs[id] = result.tournament_matches.sync()
+            events = sync.apply(result._raw['matches'])
+        self._quiet_polls[id] = 0 if events else self._quiet_polls.get(id, 0) + 1
+
+        was_live = self._is_live(id)
+        self.latest[id] = result
+        if self._is_live(id) and not was_live:
+            # Just went live: fetch the bracket right away.
+            self._schedule(id, self.min_interval, time.monotonic())
+        else:
+            self._schedule(id, self.interval(result))
+
+        for callback in self._callbacks:
+            callback(result, events)
+
+    def _schedule(self, id, interval, when = None):
+        self._demand += 1 / interval - 1 / self._intervals.get(id, float('inf'))
+        self._intervals[id] = interval
+
+        if when is None:
+            when = time.monotonic() + interval * max(1.0, self._demand / self.budget)
+        self._due[id] = when
+        heapq.heappush(self._queue, (when, id))
+
+
+# The asyncio counterpart of `PollScheduler`, built from `AsyncTournaments`.
+# `MatchSync.apply` is synchronous, so events are also delivered synchronously.
+class AsyncPollScheduler(PollScheduler):
+    async def step(self):
+        due = self._pop_due()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def poll(id):
+            async with semaphore:
+                return await self._poll(id)
+
+        results = await asyncio.gather(*[poll(id) for id in due])
+        for id, result in zip(due, results):
+            self._handle(id, result)
+        return due
+
+    # Polls until cancelled.
+    async def run(self):
+        while True:
+            await self.step()
+            await asyncio.sleep(max(0.0, self._next_due() - time.monotonic()))
+
+    async def _poll(self, id):
+        try:
+            return await self.tournaments.get(id, include_matches = self._is_live(id))
+        except Exception as e:
+            return e
@@ -0,0 +1,299 @@
+import functools
+import re
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from _enums import TournamentType, TournamentRankedBy, MatchState
+
+
+# Challonge's tie breaks when a tournament does not list its own.
+DEFAULT_TIE_BREAKS = ('match wins vs tied', 'game wins', 'points scored')
+
+# The statistic each supported tie break compares. "match wins vs tied" is
+# head-to-head between the tied participants and is resolved separately.
+TIE_BREAK_COLUMNS = {
+    'match wins': 'match_wins',
+    'game wins': 'game_wins',
+    'game win percentage': 'game_win_percentage',
+    'points scored': 'points_scored',
+    'points difference': 'points_difference',
+    'median buchholz': 'median_buchholz'
+}
+HEAD_TO_HEAD = 'match wins vs tied'
+
+RANKED_BY_COLUMNS = {
+    TournamentRankedBy.match_wins: 'points',
+    TournamentRankedBy.game_wins: 'game_wins',
+    TournamentRankedBy.points_scored: 'points_scored',
+    TournamentRankedBy.points_difference: 'points_difference',
+    TournamentRankedBy.custom: 'points'
+}
+
+# Statistics summed over every match a participant played, in the order of
+# the columns after `player` and `opponent` in each row.
+COUNTED = ('match_wins', 'match_losses', 'match_ties', 'byes', 'game_wins', 'game_losses', 'game_ties',
+    'points_scored', 'points_against')
+STATS = COUNTED + ('points', 'points_difference', 'game_win_percentage', 'median_buchholz')
+
+# A row with no participant, used for matches that do not count (yet).
+_EMPTY_ROW = (0, -1) + (0,) * len(COUNTED)
+
+
+# One participant's line in the standings.
+class Standing:
+    __slots__ = ('participant_id', 'rank') + STATS
+
+    def __init__(self, participant_id, rank, stats):
+        self.participant_id = participant_id
+        self.rank = rank
+        (self.match_wins, self.match_losses, self.match_ties, self.byes, self.game_wins, self.game_losses,
+            self.game_ties, self.points_scored, self.points_against, self.points, self.points_difference,
+            self.game_win_percentage, self.median_buchholz) = stats
+
+    def __repr__(self):
+        return f"<Standing rank={self.rank} participant_id={self.participant_id} points={self.points}>"
+
+
+# Standings computed locally from the completed matches of a tournament.
+#
+# Each match's `scores_csv` is parsed once into two rows, one per player,
+# which are written in place into a table (a NumPy array when NumPy is
+# installed, a list otherwise). Per-participant totals are then sums over
+# the whole table (`numpy.bincount`), so recomputing after a score change
+# costs little more than reading the result. Points use the tournament's
+# `pts_*` settings, or its `rr_pts_*` settings for round robin, and
+# participants are ranked by `ranked_by` and then by `tie_breaks`. A complete
+# match with a single player counts as a bye.
+#
+# `update` applies one changed match; the standings are recomputed on the next read.
+class Standings:
+    def __init__(self, tournament, matches = None):
+        prefix = 'rr_pts_for_' if tournament.tournament_type == TournamentType.round_robin else 'pts_for_'
+        self.pts_for_match_win = _float(getattr(tournament, prefix + 'match_win'), 1.0)
+        self.pts_for_match_tie = _float(getattr(tournament, prefix + 'match_tie'), 0.5)
+        self.pts_for_game_win = _float(getattr(tournament, prefix + 'game_win'), 0.0)
+        self.pts_for_game_tie = _float(getattr(tournament, prefix + 'game_tie'), 0.0)
+        self.pts_for_bye = _float(tournament.pts_for_bye, 1.0)
+        self.ranked_by = RANKED_BY_COLUMNS[tournament.ranked_by or TournamentRankedBy.match_wins]
+        self.tie_breaks = [i for i in (tournament.tie_breaks or DEFAULT_TIE_BREAKS)
+            if i in TIE_BREAK_COLUMNS or i == HEAD_TO_HEAD]
+
+        # Participants without a completed match still get a line.
+        self.participant_ids = []
+        self._indexes = {}
+        for participant in tournament._raw.get('participants') or []:
+            self._index(participant['participant']['id'])
+
+        self._slots = {}
+        self._table = _table(64)
+        self._rows = None
+        self._by_id = None
+        for match in tournament.matches if matches is None else matches:
+            self.update(match)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.participant_ids)
+
+    # The standings, best first.
+    @property
+    def rows(self):
+        if self._rows is None:
+            self._rows = self._compute()
+        return self._rows
+
+    # The standing of one participant, or None.
+    def get(self, participant_id):
+        if self._by_id is None:
+            self._by_id = {i.participant_id: i for i in self.rows}
+        return self._by_id.get(participant_id)
+
+    # Applies a new version of one match.
+    def update(self, match):
+        rows = self._match_rows(match)
+        slot = self._slots.get(match.id)
+        if slot is None:
+            if rows[0] == _EMPTY_ROW:
+                return
+            slot = self._slots[match.id] = len(self._slots)
+            if 2 * slot + 2 > len(self._table):
+                self._table = _grow(self._table)
+
+        self._table[2 * slot] = rows[0]
+        self._table[2 * slot + 1] = rows[1]
+        self._rows = None
+        self._by_id = None
+
+    def _match_rows(self, match):
+        if not match.state == MatchState.complete:
+            return _EMPTY_ROW, _EMPTY_ROW
+
+        player1, player2 = match.player1_id, match.player2_id
+        if player1 is None or player2 is None:
+            player = player1 if player2 is None else player2
+            if player is None:
+                return _EMPTY_ROW, _EMPTY_ROW
+            return (self._index(player), -1, 0, 0, 0, 1, 0, 0, 0, 0, 0), _EMPTY_ROW
+
+        games1, games2, ties, scored1, scored2 = _parse_scores(match.scores_csv or '')
+        won1, won2 = int(match.winner_id == player1), int(match.winner_id == player2)
+        tie = int(not (won1 or won2))
+        player1, player2 = self._index(player1), self._index(player2)
+        return (
+            (player1, player2, won1, won2, tie, 0, games1, games2, ties, scored1, scored2),
+            (player2, player1, won2, won1, tie, 0, games2, games1, ties, scored2, scored1)
+        )
+
+    def _index(self, participant_id):
+        if participant_id not in self._indexes:
+            self._indexes[participant_id] = len(self.participant_ids)
+            self.participant_ids.append(participant_id)
+        return self._indexes[participant_id]
+
+    def _compute(self):
+        count = len(self.participant_ids)
+        table = self._table[:2 * len(self._slots)]
+
+        stats = _sum_columns(table, count)
+        stats['points'] = [
+            self.pts_for_match_win * stats['match_wins'][i] + self.pts_for_match_tie * stats['match_ties'][i] +
+            self.pts_for_game_win * stats['game_wins'][i] + self.pts_for_game_tie * stats['game_ties'][i] +
+            self.pts_for_bye * stats['byes'][i]
+            for i in range(count)
+        ]
+        stats['points_difference'] = [i - j for i, j in zip(stats['points_scored'], stats['points_against'])]
+        stats['game_win_percentage'] = [
+            i / (i + j + k) if i + j + k else 0.0
+            for i, j, k in zip(stats['game_wins'], stats['game_losses'], stats['game_ties'])
+        ]
+        stats['median_buchholz'] = _median_buchholz(table, stats['points'], count)
+
+        keys = [stats[self.ranked_by]]
+        for tie_break in self.tie_breaks:
+            keys.append(None if tie_break == HEAD_TO_HEAD else stats[TIE_BREAK_COLUMNS[tie_break]])
+        if None in keys:
+            position = keys.index(None)
+            keys[position] = _head_to_head(table, list(zip(*keys[:position])), count)
+        values = list(zip(*keys))
+        order = _order(keys, count)
+
+        columns = list(zip(*[stats[i] for i in STATS]))
+        standings = []
+        for position, i in enumerate(order):
+            if position and values[i] == values[order[position - 1]]:
+                rank = standings[-1].rank
+            else:
+                rank = position + 1
+            standings.append(Standing(self.participant_ids[i], rank, columns[i]))
+        return standings
+
+
+# Splits a `scores_csv` such as "3-1,1-3,-1-2" into game wins, game losses and
+# game ties from player 1's side, and the points scored by each player.
+@functools.lru_cache(maxsize = 4096)
+def _parse_scores(scores_csv):
+    games1 = games2 = ties = scored1 = scored2 = 0
+    for game in scores_csv.split(','):
+        scores = _SCORE.match(game.strip())
+        if not scores:
+            continue
+        score1, score2 = int(scores.group(1)), int(scores.group(2))
+        scored1 += score1
+        scored2 += score2
+        if score1 > score2:
+            games1 += 1
+        elif score2 > score1:
+            games2 += 1
+        else:
+            ties += 1
+    return games1, games2, ties, scored1, scored2
+
+_SCORE = re.compile(r'^(-?\d+)-(-?\d+)$')
+
+# The head-to-head key: for each group of participants tied on every key
+# before it (`values`), the matches won against the other members of the group.
+def _head_to_head(table, values, count):
+    groups = {}
+    group_of = [groups.setdefault(i, len(groups)) for i in values] if values else [0] * count
+
+    if numpy is not None:
+        group_of = numpy.asarray(group_of, dtype = numpy.int64)
+        players, opponents, won = table[:, 0], table[:, 1], table[:, 2]
+        counted = (won == 1) & (opponents >= 0)
+        counted &= group_of[players] == group_of[numpy.maximum(opponents, 0)]
+        return numpy.bincount(players[counted], minlength = count).tolist()
+
+    wins = [0] * count
+    for player, opponent, won in (i[:3] for i in table):
+        if won and opponent >= 0 and group_of[player] == group_of[opponent]:
+            wins[player] += 1
+    return wins
+
+# Participant indexes sorted by every key, highest first.
+def _order(keys, count):
+    if numpy is not None:
+        return numpy.lexsort([-numpy.asarray(i, dtype = numpy.float64) for i in reversed(keys)]).tolist()
+
+    values = list(zip(*keys))
+    return sorted(range(count), key = lambda i: tuple(-j for j in values[i]))
+
+def _float(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+def _table(size):
+    if numpy is not None:
+        table = numpy.zeros((size, len(_EMPTY_ROW)), dtype = numpy.int64)
+        table[:, 1] = -1
+        return table
+    return [_EMPTY_ROW] * size
+
+def _grow(table):
+    if numpy is not None:
+        return numpy.concatenate([table, _table(len(table))])
+    return table + _table(len(table))
+
+# The `COUNTED` totals of every participant.
+def _sum_columns(table, count):
+    if numpy is not None:
+        players = table[:, 0]
+        return {
+            i: numpy.bincount(players, weights = table[:, j], minlength = count).astype(numpy.int64).tolist()
+            for j, i in enumerate(COUNTED, 2)
+        }
+
+    totals = [[0] * count for i in COUNTED]
+    for row in table:
+        for i, j in zip(totals, row[2:]):
+            i[row[0]] += j
+    return dict(zip(COUNTED, totals))
+
+# The sum of each participant's opponents' points, without the best and the
+# worst of them once there are at least three.
+def _median_buchholz(table, points, count):
+    if numpy is not None:
+        counted = table[:, 1] >= 0
+        players, opponents = table[counted, 0], table[counted, 1]
+        opponent_points = numpy.asarray(points, dtype = numpy.float64)[opponents]
+        totals = numpy.bincount(players, weights = opponent_points, minlength = count).astype(numpy.float64)
+        played = numpy.bincount(players, minlength = count)
+        highest = numpy.full(count, -numpy.inf)
+        lowest = numpy.full(count, numpy.inf)
+        numpy.maximum.at(highest, players, opponent_points)
+        numpy.minimum.at(lowest, players, opponent_points)
+        trimmed = played >= 3
+        totals[trimmed] -= highest[trimmed] + lowest[trimmed]
+        return totals.tolist()
+
+    opponent_points = [[] for i in range(count)]
+    for player, opponent in (i[:2] for i in table):
+        if opponent >= 0:
+            opponent_points[player].append(points[opponent])
+    return [sum(i) - max(i) - min(i) if len(i) >= 3 else sum(i) for i in opponent_points]
@@ -1,309 +1,545 @@
-import requests
-import re
-from urllib.parse import urlencode
-import datetime
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 
-from _data_management import _prepare_params
-from _enums import TournamentType, TournamentRankedBy, TournamentGrandFinalModifier, MatchState
+from _data_management import _prepare_params, _parse_datetime, _tournament_settings, _match_filters, _match_settings, _match_id, _participant_id, _participant_settings, _bulk_participant_params, _count
+from _enums import TournamentType, TournamentRankedBy, TournamentGrandFinalModifier
 from _errors import *
-from match import Match
+from _fields import LazyField, model_fields, compile_dehydrator
+from bracket import BracketGraph
+from match import Match, AsyncMatch
+from match_sync import MatchSync, AsyncMatchSync
+from match_table import MatchTable
 from participant import Participant
+from standings import Standings
+
+
+# How many participants `bulk_add` sends per request.
+BULK_ADD_BATCH_SIZE = 100
 
 
 class Matches:
-    def __init__(self, base_api_link, auth_info, tournament_id):
-        self.base_api_link = base_api_link
-        self.auth_info = auth_info
+    _match_class = Match
+
+    def __init__(self, http, tournament_id):
+        self.http = http
+        self.base_api_link = http.base_link
+        self.auth_info = http.auth_info
         self.tournament_id = tournament_id
 
     def get_all(self, state = None, participant_id = None):
-        req_link = self.base_api_link + f"tournaments/{self.tournament_id}/matches.json"
+        return self._fetch(state, participant_id, self._wrap_all)
+
+    # Like `get_all`, but returns the matches as a columnar `MatchTable`.
+    def get_table(self, state = None, participant_id = None):
+        return MatchTable(self._fetch(state, participant_id), self.http, self._match_class)
+
+    # A `MatchSync` that tracks these matches between polls.
+    def sync(self):
+        return MatchSync(self)
+
+    # Retrieves the match payloads, raw or built by `hydrate` (a coroutine for `AsyncMatches`).
+    def _fetch(self, state = None, participant_id = None, hydrate = None):
+        data = _match_filters(state, participant_id)
+
+        return self.http.request('GET', f"tournaments/{self.tournament_id}/matches.json", _prepare_params(data), hydrate = hydrate)
+
+    # Reports many results at once, with at most `concurrency` requests in flight.
+    #
+    # `reports` is a list of `(match, settings)` pairs, where `match` is a `Match`
+    # or its ID and `settings` a dict of the arguments of `Match.update`. Every
+    # report is validated before anything is sent, and reports for the same match
+    # are merged in order into a single request. Returns a dict from match ID to
+    # the updated `Match`, or to the `HTTPException` raised for it; `Match`
+    # objects that were passed in are updated in place.
+    def report_many(self, reports, concurrency = 8):
+        batch = self._coalesce(reports, concurrency)
+
+        def report(item):
+            match, data = item
+            try:
+                return self.http.request('PUT', self._match_path(match), _prepare_params(data, 'match'),
+                    hydrate = lambda match_data: self._apply_report(match, match_data))
+            except HTTPException as e:
+                return e
 
-        data = {}
-        if participant_id:
-            if isinstance(participant_id, Participant):
-                participant_id = participant_id.id
-            else:
-                if not isinstance(participant_id, int):
-                    raise BadArgument('Parameter `participant_id` must be of type int')
-            data['participant_id'] = participant_id
+        with ThreadPoolExecutor(max_workers = concurrency) as executor:
+            return dict(zip(batch.keys(), executor.map(report, batch.values())))
+
+    def _coalesce(self, reports, concurrency):
+        _count('concurrency', concurrency)
+
+        batch = {}
+        for match, settings in reports:
+            if not isinstance(settings, dict):
+                raise BadArgument('Every report must be a `(match, settings)` pair with a dict of settings')
+            data = _match_settings(**settings)
+
+            id = _match_id(match)
+            previous, merged = batch.get(id, (None, {}))
+            merged.update(data)
+            batch[id] = (match if isinstance(match, Match) else previous, merged)
+
+        if len(batch) == 0 or not all(i[1] for i in batch.values()):
+            raise UserInputError()
+        return {id: (match or id, data) for id, (match, data) in batch.items()}
 
-        if state:
-            if not isinstance(state, MatchState):
+    def _match_path(self, match):
+        return f"tournaments/{self.tournament_id}/matches/{_match_id(match)}.json"
+
+    def _apply_report(self, match, match_data):
+        if isinstance(match, Match):
+            match._load(match_data)
+            return match
+        return self._match_class(match_data, self.http)
+
+    def _wrap_all(self, matches_data):
+        return [self._match_class(match_data, self.http) for match_data in matches_data]
+
+# The asyncio counterpart of `Matches`.
+class AsyncMatches(Matches):
+    _match_class = AsyncMatch
+
+    async def get_all(self, state = None, participant_id = None):
+        return await self._fetch(state, participant_id, self._wrap_all)
+
+    async def get_table(self, state = None, participant_id = None):
+        return MatchTable(await self._fetch(state, participant_id), self.http, self._match_class)
+
+    def sync(self):
+        return AsyncMatchSync(self)
+
+    # See `Matches.report_many`.
+    async def report_many(self, reports, concurrency = 8):
+        batch = self._coalesce(reports, concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def report(match, data):
+            async with semaphore:
                 try:
-                    state = MatchState(state)
-                except:
-                    raise BadArgument(f"Parameter `state` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(MatchState)])}")
+                    return await self.http.request('PUT', self._match_path(match), _prepare_params(data, 'match'),
+                        hydrate = lambda match_data: self._apply_report(match, match_data))
+                except HTTPException as e:
+                    return e
+
+        return dict(zip(batch.keys(), await asyncio.gather(*[report(i, j) for i, j in batch.values()])))
+
+# The participants of one tournament.
+#
+# Every participant returned by a call is also kept in three indexes,
+# `by_id`, `by_name` and `by_seed`. Once all participants are known (after
+# `get_all`, or when the tournament was fetched with its participants), adding,
+# moving or removing one also updates the seeds of the others locally instead
+# of fetching them again.
+class Participants:
+    def __init__(self, http, tournament_id, participants = None):
+        self.http = http
+        self.base_api_link = http.base_link
+        self.auth_info = http.auth_info
+        self.tournament_id = tournament_id
 
-            data['state'] = state.name
+        self.by_id = {}
+        self.by_name = {}
+        self.by_seed = {}
+        self._complete = False
+        if participants is not None:
+            self._replace(participants)
 
-        url_params = ""
-        if len(data.keys()) > 0:
-            url_params = "?" + urlencode(_prepare_params(data))
+    def __iter__(self):
+        return iter(sorted(self.by_id.values(), key = lambda i: (i.seed or 0, i.id)))
 
-        req = requests.get(req_link + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            raise HTTPException(req.status_code)
-        else:
-            return [Match(match_data, self.base_link, self.auth_info) for match_data in req.json()]
+    def __len__(self):
+        return len(self.by_id)
 
-# A Tournament object. Contains all information on a tournament
-# as well as methods relating to acting on a tournament.
-class Tournament:
-    def __init__(self, raw_tournament_data, base_link, auth_info):
-        # There are 80 attributes here. This is getting out of hand.
-        raw_tournament_data = raw_tournament_data['tournament']
+    def get_all(self):
+        return self._replace(self.http.request('GET', self._path(), hydrate = self._wrap_all))
 
-        self.api_base_link = base_link
-        self.auth_info = auth_info
-        self.id = raw_tournament_data['id']
-        self.name = raw_tournament_data['name']
-        self.description = raw_tournament_data['description']
-        self.tournament_type = TournamentType(raw_tournament_data['tournament_type'])
-
-        if raw_tournament_data['started_at']:
-            split_date = raw_tournament_data['started_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.started_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.started_at = raw_tournament_data['started_at']
+    def get(self, participant_id, include_matches = False):
+        data = {"include_matches": int(include_matches)}
 
-        if raw_tournament_data['completed_at']:
-            split_date = raw_tournament_data['completed_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.completed_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.completed_at = raw_tournament_data['completed_at']
+        return self._store(self.http.request('GET', self._path(_participant_id(participant_id)), _prepare_params(data), hydrate = self._wrap))
 
-        self.require_score_agreement = raw_tournament_data['require_score_agreement']
-        self.notify_users_when_matches_open = raw_tournament_data['notify_users_when_matches_open']
+    def create(self, name = None, email = None, challonge_username = None, seed = None, misc = None):
+        data = _participant_settings(name, email, challonge_username, seed, misc)
+        if len(data.keys()) == 0:
+            raise UserInputError()
 
-        if raw_tournament_data['created_at']:
-            split_date = raw_tournament_data['created_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.created_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.created_at = raw_tournament_data['created_at']
+        return self._store(self.http.request('POST', self._path(), _prepare_params(data, 'participant'), hydrate = self._wrap))
 
-        if raw_tournament_data['updated_at']:
-            split_date = raw_tournament_data['updated_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.updated_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.updated_at = raw_tournament_data['updated_at']
-
-        self.state = raw_tournament_data['state']
-        self.open_signup = raw_tournament_data['open_signup']
-        self.notify_users_when_the_tournament_ends = raw_tournament_data['notify_users_when_the_tournament_ends']
-        self.progress_meter = raw_tournament_data['progress_meter']
-        self.quick_advance = raw_tournament_data['quick_advance']
-        self.hold_third_place_match = raw_tournament_data['hold_third_place_match']
-        self.pts_for_game_win = raw_tournament_data['pts_for_game_win']
-        self.pts_for_game_tie = raw_tournament_data['pts_for_game_tie']
-        self.pts_for_match_win = raw_tournament_data['pts_for_match_win']
-        self.pts_for_match_tie = raw_tournament_data['pts_for_match_tie']
-        self.pts_for_bye = raw_tournament_data['pts_for_bye']
-        self.swiss_rounds = raw_tournament_data['swiss_rounds']
-        self.private = raw_tournament_data['private']
-        self.ranked_by = TournamentRankedBy(raw_tournament_data['ranked_by'])
-        self.show_rounds = raw_tournament_data['show_rounds']
-        self.hide_forum = raw_tournament_data['hide_forum']
-        self.sequential_pairings = raw_tournament_data['sequential_pairings']
-        self.accept_attachments = raw_tournament_data['accept_attachments']
-        self.rr_pts_for_game_win = raw_tournament_data['rr_pts_for_game_win']
-        self.rr_pts_for_game_tie = raw_tournament_data['rr_pts_for_game_tie']
-        self.rr_pts_for_match_win = raw_tournament_data['rr_pts_for_match_win']
-        self.rr_pts_for_match_tie = raw_tournament_data['rr_pts_for_match_tie']
-        self.created_by_api = raw_tournament_data['created_by_api']
-        self.credit_capped = raw_tournament_data['credit_capped']
-        self.category = raw_tournament_data['category']
-        self.hide_seeds = raw_tournament_data['hide_seeds']
-        self.prediction_method = raw_tournament_data['prediction_method']
-        self.predictions_opened_at = raw_tournament_data['predictions_opened_at']
-        self.anonymous_voting = raw_tournament_data['anonymous_voting']
-        self.max_predictions_per_user = raw_tournament_data['max_predictions_per_user']
-        self.signup_cap = raw_tournament_data['signup_cap']
-        self.game_id = raw_tournament_data['game_id']
-        self.participants_count = raw_tournament_data['participants_count']
-        self.group_stages_enabled = raw_tournament_data['group_stages_enabled']
-        self.allow_participant_match_reporting = raw_tournament_data['allow_participant_match_reporting']
-        self.teams = raw_tournament_data['teams']
-        self.check_in_duration = raw_tournament_data['check_in_duration']
-
-        if raw_tournament_data['start_at']:
-            split_date = raw_tournament_data['start_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.start_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.start_at = raw_tournament_data['start_at']
+    # Adds many participants with one request per `batch_size` of them. Each
+    # entry is a name or a dict of `name`, `invite_name_or_email`, `seed` and `misc`.
+    def bulk_add(self, participants, batch_size = BULK_ADD_BATCH_SIZE):
+        added = []
+        for batch in self._batches(participants, batch_size):
+            added.extend(self._store_all(self.http.request('POST', self._path('bulk_add'), batch, hydrate = self._wrap_all)))
+        return added
 
-        if raw_tournament_data['started_checking_in_at']:
-            split_date = raw_tournament_data['started_checking_in_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.started_checking_in_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.started_checking_in_at = raw_tournament_data['started_checking_in_at']
+    def update(self, participant_id, name = None, email = None, challonge_username = None, seed = None, misc = None):
+        data = _participant_settings(name, email, challonge_username, seed, misc)
+        if len(data.keys()) == 0:
+            raise UserInputError()
 
-        self.tie_breaks = raw_tournament_data['tie_breaks']
+        return self._store(self.http.request('PUT', self._path(_participant_id(participant_id)), _prepare_params(data, 'participant'), hydrate = self._wrap))
+
+    def delete(self, participant_id):
+        participant_id = _participant_id(participant_id)
+
+        self.http.request('DELETE', self._path(participant_id))
+        self._discard(participant_id)
+
+    def check_in(self, participant_id):
+        return self._store(self.http.request('POST', self._path(_participant_id(participant_id), 'check_in'), hydrate = self._wrap))
+
+    def undo_check_in(self, participant_id):
+        return self._store(self.http.request('POST', self._path(_participant_id(participant_id), 'undo_check_in'), hydrate = self._wrap))
+
+    # Shuffles the seeds of every participant. Only possible before the tournament starts.
+    def randomize(self):
+        return self._replace(self.http.request('POST', self._path('randomize'), hydrate = self._wrap_all))
+
+    def _path(self, *parts):
+        return '/'.join([f"tournaments/{self.tournament_id}/participants", *map(str, parts)]) + '.json'
+
+    def _wrap(self, participant_data):
+        return Participant(participant_data, self.http)
+
+    def _wrap_all(self, participants_data):
+        return [Participant(i, self.http) for i in participants_data]
+
+    def _batches(self, participants, batch_size):
+        _count('batch_size', batch_size)
+
+        participants = list(participants)
+        if len(participants) == 0:
+            raise UserInputError()
+        return [_bulk_participant_params(participants[i:i + batch_size]) for i in range(0, len(participants), batch_size)]
+
+    def _replace(self, participants):
+        self.by_id = {i.id: i for i in participants}
+        self.by_name = {i.name: i for i in participants}
+        self.by_seed = {i.seed: i for i in participants if i.seed is not None}
+        self._complete = True
+        return participants
+
+    def _store(self, participant):
+        self._store_all([participant])
+        return participant
+
+    def _store_all(self, participants):
+        for participant in participants:
+            previous = self.by_id.get(participant.id)
+            if previous is not None and self.by_name.get(previous.name) is previous:
+                del self.by_name[previous.name]
+            self.by_id[participant.id] = participant
+            self.by_name[participant.name] = participant
+        self._reseed(participants)
+        return participants
+
+    def _discard(self, participant_id):
+        participant = self.by_id.pop(participant_id, None)
+        if participant is not None and self.by_name.get(participant.name) is participant:
+            del self.by_name[participant.name]
+        self._reseed(())
+
+    # Challonge keeps seeds contiguous from 1. The participants just returned
+    # by the API keep their seeds and, once every participant is known, the
+    # others keep their order and move into the remaining seeds.
+    def _reseed(self, updated):
+        if self._complete:
+            taken = {i.seed for i in updated}
+            updated = {i.id for i in updated}
+            seed = 1
+            for participant in sorted(self.by_id.values(), key = lambda i: i.seed or 0):
+                if participant.id in updated or participant.seed is None:
+                    continue
+                while seed in taken:
+                    seed += 1
+                if not participant.seed == seed:
+                    participant.seed = seed
+                seed += 1
+        self.by_seed = {i.seed: i for i in self.by_id.values() if i.seed is not None}
+
+# The asyncio counterpart of `Participants`.
+class AsyncParticipants(Participants):
+    async def get_all(self):
+        return self._replace(await self.http.request('GET', self._path(), hydrate = self._wrap_all))
+
+    async def get(self, participant_id, include_matches = False):
+        data = {"include_matches": int(include_matches)}
+
+        return self._store(await self.http.request('GET', self._path(_participant_id(participant_id)), _prepare_params(data), hydrate = self._wrap))
+
+    async def create(self, name = None, email = None, challonge_username = None, seed = None, misc = None):
+        data = _participant_settings(name, email, challonge_username, seed, misc)
+        if len(data.keys()) == 0:
+            raise UserInputError()
+
+        return self._store(await self.http.request('POST', self._path(), _prepare_params(data, 'participant'), hydrate = self._wrap))
+
+    async def bulk_add(self, participants, batch_size = BULK_ADD_BATCH_SIZE):
+        added = []
+        for batch in self._batches(participants, batch_size):
+            added.extend(self._store_all(await self.http.request('POST', self._path('bulk_add'), batch, hydrate = self._wrap_all)))
+        return added
+
+    async def update(self, participant_id, name = None, email = None, challonge_username = None, seed = None, misc = None):
+        data = _participant_settings(name, email, challonge_username, seed, misc)
+        if len(data.keys()) == 0:
+            raise UserInputError()
+
+        return self._store(await self.http.request('PUT', self._path(_participant_id(participant_id)), _prepare_params(data, 'participant'), hydrate = self._wrap))
+
+    async def delete(self, participant_id):
+        participant_id = _participant_id(participant_id)
+
+        await self.http.request('DELETE', self._path(participant_id))
+        self._discard(participant_id)
+
+    async def check_in(self, participant_id):
+        return self._store(await self.http.request('POST', self._path(_participant_id(participant_id), 'check_in'), hydrate = self._wrap))
+
+    async def undo_check_in(self, participant_id):
+        return self._store(await self.http.request('POST', self._path(_participant_id(participant_id), 'undo_check_in'), hydrate = self._wrap))
+
+    async def randomize(self):
+        return self._replace(await self.http.request('POST', self._path('randomize'), hydrate = self._wrap_all))
+
+# A Tournament object. Contains all information on a tournament
+# as well as methods relating to acting on a tournament.
+class Tournament:
+    __slots__ = ('http', 'api_base_link', 'auth_info', '_raw', '_values', '_tournament_matches', '_tournament_participants', '_bracket', '_standings', '_pending', 'matches', 'participants')
+
+    _matches_class = Matches
+    _participants_class = Participants
+
+    # There are 80 attributes here. Rather than copying every one of them up
+    # front, each is decoded from the raw payload the first time it is read.
+    id = LazyField('id')
+    name = LazyField('name')
+    description = LazyField('description')
+    tournament_type = LazyField('tournament_type', TournamentType)
+    started_at = LazyField('started_at', _parse_datetime)
+    completed_at = LazyField('completed_at', _parse_datetime)
+    require_score_agreement = LazyField('require_score_agreement')
+    notify_users_when_matches_open = LazyField('notify_users_when_matches_open')
+    created_at = LazyField('created_at', _parse_datetime)
+    updated_at = LazyField('updated_at', _parse_datetime)
+    state = LazyField('state')
+    open_signup = LazyField('open_signup')
+    notify_users_when_the_tournament_ends = LazyField('notify_users_when_the_tournament_ends')
+    progress_meter = LazyField('progress_meter')
+    quick_advance = LazyField('quick_advance')
+    hold_third_place_match = LazyField('hold_third_place_match')
+    pts_for_game_win = LazyField('pts_for_game_win')
+    pts_for_game_tie = LazyField('pts_for_game_tie')
+    pts_for_match_win = LazyField('pts_for_match_win')
+    pts_for_match_tie = LazyField('pts_for_match_tie')
+    pts_for_bye = LazyField('pts_for_bye')
+    swiss_rounds = LazyField('swiss_rounds')
+    private = LazyField('private')
+    ranked_by = LazyField('ranked_by', TournamentRankedBy)
+    show_rounds = LazyField('show_rounds')
+    hide_forum = LazyField('hide_forum')
+    sequential_pairings = LazyField('sequential_pairings')
+    accept_attachments = LazyField('accept_attachments')
+    rr_pts_for_game_win = LazyField('rr_pts_for_game_win')
+    rr_pts_for_game_tie = LazyField('rr_pts_for_game_tie')
+    rr_pts_for_match_win = LazyField('rr_pts_for_match_win')
+    rr_pts_for_match_tie = LazyField('rr_pts_for_match_tie')
+    created_by_api = LazyField('created_by_api')
+    credit_capped = LazyField('credit_capped')
+    category = LazyField('category')
+    hide_seeds = LazyField('hide_seeds')
+    prediction_method = LazyField('prediction_method')
+    predictions_opened_at = LazyField('predictions_opened_at')
+    anonymous_voting = LazyField('anonymous_voting')
+    max_predictions_per_user = LazyField('max_predictions_per_user')
+    signup_cap = LazyField('signup_cap')
+    game_id = LazyField('game_id')
+    participants_count = LazyField('participants_count')
+    group_stages_enabled = LazyField('group_stages_enabled')
+    allow_participant_match_reporting = LazyField('allow_participant_match_reporting')
+    teams = LazyField('teams')
+    check_in_duration = LazyField('check_in_duration')
+    start_at = LazyField('start_at', _parse_datetime)
+    started_checking_in_at = LazyField('started_checking_in_at', _parse_datetime)
+    tie_breaks = LazyField('tie_breaks')
+    locked_at = LazyField('locked_at', _parse_datetime)
+    event_id = LazyField('event_id')
+    public_predictions_before_start_time = LazyField('public_predictions_before_start_time')
+    ranked = LazyField('ranked')
+    grand_finals_modifier = LazyField('grand_finals_modifier', TournamentGrandFinalModifier)
+    predict_the_losers_bracket = LazyField('predict_the_losers_bracket')
+    spam = LazyField('spam')
+    ham = LazyField('ham')
+    rr_iterations = LazyField('rr_iterations')
+    tournament_registration_id = LazyField('tournament_registration_id')
+    donation_contest_enabled = LazyField('donation_contest_enabled')
+    mandatory_donation = LazyField('mandatory_donation')
+    non_elimination_tournament_data = LazyField('non_elimination_tournament_data')
+    auto_assign_stations = LazyField('auto_assign_stations')
+    only_start_matches_with_stations = LazyField('only_start_matches_with_stations')
+    registration_fee = LazyField('registration_fee')
+    registration_type = LazyField('registration_type')
+    split_participants = LazyField('split_participants')
+    description_source = LazyField('description_source')
+    subdomain = LazyField('subdomain')
+    url = LazyField('full_challonge_url')
+    image_url = LazyField('live_image_url')
+    sign_up_url = LazyField('sign_up_url')
+    review_before_finalizing = LazyField('review_before_finalizing')
+    accepting_predictions = LazyField('accepting_predictions')
+    participants_locked = LazyField('participants_locked')
+    game = LazyField('game_name')
+    participants_swappable = LazyField('participants_swappable')
+    team_convertable = LazyField('team_convertable')
+    group_stages_were_started = LazyField('group_stages_were_started')
+
+    def __init__(self, raw_tournament_data, http):
+        raw_tournament_data = raw_tournament_data['tournament']
+
+        self.http = http
+        self.api_base_link = http.base_link
+        self.auth_info = http.auth_info
+        self._raw = raw_tournament_data
+        self._values = {}
+        self._tournament_matches = None
+        self._tournament_participants = None
+        self._bracket = None
+        self._standings = None
+        self._pending = None
 
-        if raw_tournament_data['locked_at']:
-            split_date = raw_tournament_data['locked_at'].split(':')
-            date_str = ":".join(split_date[:-1]) + split_date[-1]
-            self.locked_at = datetime.datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-        else:
-            self.locked_at = raw_tournament_data['locked_at']
-
-        self.event_id = raw_tournament_data['event_id']
-        self.public_predictions_before_start_time = raw_tournament_data['public_predictions_before_start_time']
-        self.ranked = raw_tournament_data['ranked']
-        self.grand_finals_modifier = TournamentGrandFinalModifier(raw_tournament_data['grand_finals_modifier'])
-        self.predict_the_losers_bracket = raw_tournament_data['predict_the_losers_bracket']
-        self.spam = raw_tournament_data['spam']
-        self.ham = raw_tournament_data['ham']
-        self.rr_iterations = raw_tournament_data['rr_iterations']
-        self.tournament_registration_id = raw_tournament_data['tournament_registration_id']
-        self.donation_contest_enabled = raw_tournament_data['donation_contest_enabled']
-        self.mandatory_donation = raw_tournament_data['mandatory_donation']
-        self.non_elimination_tournament_data = raw_tournament_data['non_elimination_tournament_data']
-        self.auto_assign_stations = raw_tournament_data['auto_assign_stations']
-        self.only_start_matches_with_stations = raw_tournament_data['only_start_matches_with_stations']
-        self.registration_fee = raw_tournament_data['registration_fee']
-        self.registration_type = raw_tournament_data['registration_type']
-        self.split_participants = raw_tournament_data['split_participants']
-        self.description_source = raw_tournament_data['description_source']
-        self.subdomain = raw_tournament_data['subdomain']
-        self.url = raw_tournament_data['full_challonge_url']
-        self.image_url = raw_tournament_data['live_image_url']
-        self.sign_up_url = raw_tournament_data['sign_up_url']
-        self.review_before_finalizing = raw_tournament_data['review_before_finalizing']
-        self.accepting_predictions = raw_tournament_data['accepting_predictions']
-        self.participants_locked = raw_tournament_data['participants_locked']
-        self.game = raw_tournament_data['game_name']
-        self.participants_swappable = raw_tournament_data['participants_swappable']
-        self.team_convertable = raw_tournament_data['team_convertable']
-        self.group_stages_were_started = raw_tournament_data['group_stages_were_started']
-
-        self.tournament_matches = Matches(self.api_base_link, self.auth_info, self.id)
         self.matches = []
         if 'matches' in raw_tournament_data.keys():
-            for match in raw_tournament_data['matches']:
-                self.matches.append(Match(match, self.base_api_link, self.auth_info))
+            self._load_matches(raw_tournament_data['matches'])
 
         if 'participants' in raw_tournament_data.keys():
-            self.participants = raw_tournament_data['participants']
+            self._load_participants(raw_tournament_data['participants'])
         else:
             self.participants = None
 
-    def abort_check_in(self, include_participants = False, include_matches = False):
-        data = {
-            "include_participants": int(include_participants),
-            "include_matches": int(include_matches)
-        }
-
-        url_params = '?' + urlencode(_prepare_params(data))
-
-        req_link = self.api_base_link + f"/tournaments/{self.id}/abort_check_in.json"
-        req = requests.post(req_link + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            try:
-                errors = req.json()
-                raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-            except:
-                raise HTTPException(req.status_code)
+    def _load_matches(self, matches_data):
+        self.matches = [self._matches_class._match_class(i, self.http) for i in matches_data]
+        self._bracket = None
+        self._standings = None
+
+    def _load_participants(self, participants_data):
+        self.participants = [Participant(i, self.http) for i in participants_data]
+        self._standings = None
+        if self._tournament_participants is not None:
+            self._tournament_participants._replace(self.participants)
+
+    # Refreshes this tournament in place from a raw payload, e.g. the response
+    # to an action. Matches and participants are rebuilt when the payload
+    # includes them and kept as they were otherwise. Local changes not in the
+    # payload are dropped.
+    #
+    # Returns the attributes whose value changed, as a dict of `(old, new)` pairs.
+    def _refresh(self, raw_tournament_data):
+        raw_tournament_data = raw_tournament_data['tournament']
+        previous, values = self._raw, self._values
 
-    def delete(self):
-        req = requests.delete(self.api_base_link + f"tournaments/{self.id}.json", auth = self.auth_info)
-        if not req.status_code == 200:
-            try:
-                errors = req.json()
-                raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-            except:
-                raise HTTPException(req.status_code)
+        # Only fields that were read or assigned, or whose raw value moved, can differ.
+        changed = [name for name, key, decoder in _FIELDS if name in values or not previous.get(key) == raw_tournament_data.get(key)]
+        old = {name: getattr(self, name) for name in changed}
 
-    def finalize(self, include_participants = False, include_matches = False):
+        if 'matches' in raw_tournament_data.keys():
+            self._load_matches(raw_tournament_data['matches'])
+        if 'participants' in raw_tournament_data.keys():
+            self._load_participants(raw_tournament_data['participants'])
+
+        # Keep serving the included matches and participants of the previous
+        # payload (`match_table` reads them) when the new one has none.
+        kept = {i: previous[i] for i in ('matches', 'participants') if i in previous and i not in raw_tournament_data}
+        self._raw = {**raw_tournament_data, **kept} if kept else raw_tournament_data
+        self._values = {}
+
+        diff = {}
+        for name in changed:
+            value = getattr(self, name)
+            if not value == old[name]:
+                diff[name] = (old[name], value)
+        return diff
+
+    @property
+    def tournament_matches(self):
+        if self._tournament_matches is None:
+            self._tournament_matches = self._matches_class(self.http, self.id)
+        return self._tournament_matches
+
+    # The `Participants` of this tournament, indexed with the included participants if any.
+    @property
+    def tournament_participants(self):
+        if self._tournament_participants is None:
+            self._tournament_participants = self._participants_class(self.http, self.id, self.participants)
+        return self._tournament_participants
+
+    # The `BracketGraph` of the matches included with this tournament, built on first use.
+    @property
+    def bracket(self):
+        if self._bracket is None:
+            self._bracket = BracketGraph(self.matches)
+        return self._bracket
+
+    # `Standings` computed locally from the matches included with this tournament, built on first use.
+    @property
+    def standings(self):
+        if self._standings is None:
+            self._standings = Standings(self)
+        return self._standings
+
+    # Builds a columnar `MatchTable` from the matches included with this tournament.
+    def match_table(self):
+        return MatchTable(self._raw.get('matches') or [], self.http, self._matches_class._match_class)
+
+    # The raw payload of this tournament with any local changes, without its
+    # matches and participants. Fields that were never read are copied as-is.
+    def to_dict(self):
+        return _dehydrate(self._values, self._raw)
+
+    # Sends one of the tournament lifecycle actions (start, finalize, ...) to
+    # Challonge and refreshes this tournament from the response. Returns what
+    # changed, as `_refresh` does.
+    def _action(self, action, include_participants, include_matches):
         data = {
             "include_participants": int(include_participants),
             "include_matches": int(include_matches)
         }
 
-        url_params = '?' + urlencode(_prepare_params(data))
+        return self.http.request('POST', f"tournaments/{self.id}/{action}.json", _prepare_params(data), self._api_paths(),
+            hydrate = self._refresh)
 
-        req_link = self.api_base_link + f"/tournaments/{self.id}/finalize.json"
-        req = requests.post(req_link + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            try:
-                errors = req.json()
-                raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-            except:
-                raise HTTPException(req.status_code)
+    # The API paths other than its ID that this tournament can be fetched by,
+    # so a write also drops responses cached under its url.
+    def _api_paths(self):
+        if not self.url:
+            return ()
 
-    def open_for_predictions(self, include_participants = False, include_matches = False):
-        data = {
-            "include_participants": int(include_participants),
-            "include_matches": int(include_matches)
-        }
+        identifier = self.url.rstrip('/').rsplit('/', 1)[-1]
+        if self.subdomain:
+            identifier = f"{self.subdomain}-{identifier}"
+        return (f"tournaments/{identifier}.json",)
 
-        url_params = '?' + urlencode(_prepare_params(data))
+    def abort_check_in(self, include_participants = False, include_matches = False):
+        return self._action('abort_check_in', include_participants, include_matches)
 
-        req_link = self.api_base_link + f"/tournaments/{self.id}/open_for_predictions.json"
-        req = requests.post(req_link + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            try:
-                errors = req.json()
-                raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-            except:
-                raise HTTPException(req.status_code)
+    def delete(self):
+        self.http.request('DELETE', f"tournaments/{self.id}.json", invalidates = self._api_paths())
 
-    def process_check_ins(self, include_participants = False, include_matches = False):
-        data = {
-            "include_participants": int(include_participants),
-            "include_matches": int(include_matches)
-        }
+    def finalize(self, include_participants = False, include_matches = False):
+        return self._action('finalize', include_participants, include_matches)
 
-        url_params = '?' + urlencode(_prepare_params(data))
+    def open_for_predictions(self, include_participants = False, include_matches = False):
+        return self._action('open_for_predictions', include_participants, include_matches)
 
-        req_link = self.api_base_link + f"/tournaments/{self.id}/process_check_ins.json"
-        req = requests.post(req_link + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            try:
-                errors = req.json()
-                raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-            except:
-                raise HTTPException(req.status_code)
+    def process_check_ins(self, include_participants = False, include_matches = False):
+        return self._action('process_check_ins', include_participants, include_matches)
 
     def reset(self, include_participants = False, include_matches = False):
-        data = {
-            "include_participants": int(include_participants),
-            "include_matches": int(include_matches)
-        }
-
-        url_params = '?' + urlencode(_prepare_params(data))
-
-        req_link = self.api_base_link + f"/tournaments/{self.id}/reset.json"
-        req = requests.post(req_link + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            try:
-                errors = req.json()
-                raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-            except:
-                raise HTTPException(req.status_code)
+        return self._action('reset', include_participants, include_matches)
 
     def start(self, include_participants = False, include_matches = False):
-        data = {
-            "include_participants": int(include_participants),
-            "include_matches": int(include_matches)
-        }
-
-        url_params = '?' + urlencode(_prepare_params(data))
-
-        req_link = self.api_base_link + f"/tournaments/{self.id}/start.json"
-        req = requests.post(req_link + url_params, auth = self.auth_info)
-        if not req.status_code == 200:
-            try:
-                errors = req.json()
-                raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-            except:
-                raise HTTPException(req.status_code)
+        return self._action('start', include_participants, include_matches)
 
     def update(self, name = None, url = None, tournament_type = None,
         subdomain = None, description = None, open_signup = None, hold_third_place_match = None,
@@ -315,222 +551,134 @@ class Tournament:
         sequential_pairings = None, signup_cap = None, start_at = None, check_in_duration = None,
         grand_finals_modifier = None):
 
-        req_url = self.api_base_link + f"tournaments/{self.id}.json"
-
-        data = {}
-
-        if name is not None:
-            if not isinstance(name, str):
-                raise BadArgument('Parameter `name` must be of type str')
-            if len(name) > 60:
-                raise BadArgument('Parameter `name` cannot be more than 60 characters')
-            data['name'] = name
-
-        if url is not None:
-            if not isinstance(url, str):
-                raise BadArgument('Parameter `url` must be of type str')
-            if len(url) > 60:
-                raise BadArgument('Parameter `url` cannot be more than 60 characters')
-            patterns = '^[a-zA-Z0-9_]*$'
-            if not re.search(patterns,  url):
-                raise BadArgument('Parameter `url` can only be letters, numbers, and underscores')
-            data['url'] = url
-
-        if tournament_type is not None:
-            if not isinstance(tournament_type, TournamentType):
-                try:
-                    tournament_type = TournamentType(tournament_type)
-                except:
-                    raise BadArgument(f"Parameter `tournament_type` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(TournamentType)])}")
-            data['tournament_type'] = tournament_type
-
-        if subdomain is not None:
-            patterns = '^[a-zA-Z0-9_]*$'
-            if not re.search(patterns,  subdomain):
-                raise BadArgument('Parameter `subdomain` can only be letters, numbers, and underscores')
-            else:
-                data['subdomain'] = subdomain
+        data = _tournament_settings(name, url, tournament_type, subdomain, description, open_signup,
+            hold_third_place_match, pts_for_match_win, pts_for_match_tie, pts_for_game_win, pts_for_game_tie,
+            swiss_rounds, pts_for_bye, ranked_by, rr_pts_for_match_win, rr_pts_for_match_tie,
+            rr_pts_for_game_win, rr_pts_for_game_tie, accept_attachments, hide_forum, show_rounds, private,
+            notify_users_when_matches_open, notify_users_when_the_tournament_ends, sequential_pairings,
+            signup_cap, start_at, check_in_duration, grand_finals_modifier)
 
-        if description is not None:
-            if not isinstance(description, str):
-                raise BadArgument('Parameter `description` must be of type str')
-            else:
-                data['description'] = description
-
-        if open_signup is not None:
-            if not isinstance(open_signup, bool):
-                raise BadArgument('Parameter `open_signup` must be of type bool')
-            else:
-                data['open_signup'] = open_signup
-
-        if hold_third_place_match is not None:
-            if not isinstance(hold_third_place_match, bool):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type bool')
-            else:
-                data['hold_third_place_match'] = hold_third_place_match
-
-        if pts_for_match_win is not None:
-            if not (isinstance(pts_for_match_win, int) or isinstance(pts_for_match_win, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                pts_for_match_win = round(float(pts_for_match_win), 1)
-                data['pts_for_match_win'] = pts_for_match_win
-
-        if pts_for_match_tie is not None:
-            if not (isinstance(pts_for_match_tie, int) or isinstance(pts_for_match_tie, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                pts_for_match_tie = round(float(pts_for_match_tie), 1)
-                data['pts_for_match_tie'] = pts_for_match_tie
-
-        if pts_for_game_win is not None:
-            if not (isinstance(pts_for_game_win, int) or isinstance(pts_for_game_win, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                pts_for_game_win = round(float(pts_for_game_win), 1)
-                data['pts_for_game_win'] = pts_for_game_win
-
-        if pts_for_game_tie is not None:
-            if not (isinstance(pts_for_game_tie, int) or isinstance(pts_for_game_tie, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                pts_for_game_tie = round(float(pts_for_game_tie), 1)
-                data['pts_for_game_tie'] = pts_for_game_tie
-
-        if rr_pts_for_match_win is not None:
-            if not (isinstance(rr_pts_for_match_win, int) or isinstance(rr_pts_for_match_win, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                rr_pts_for_match_win = round(float(rr_pts_for_match_win), 1)
-                data['rr_pts_for_match_win'] = rr_pts_for_match_win
-
-        if rr_pts_for_match_tie is not None:
-            if not (isinstance(rr_pts_for_match_tie, int) or isinstance(rr_pts_for_match_tie, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                rr_pts_for_match_tie = round(float(rr_pts_for_match_tie), 1)
-                data['rr_pts_for_match_tie'] = rr_pts_for_match_tie
-
-        if rr_pts_for_game_win is not None:
-            if not (isinstance(rr_pts_for_game_win, int) or isinstance(rr_pts_for_game_win, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                rr_pts_for_game_win = round(float(rr_pts_for_game_win), 1)
-                data['rr_pts_for_game_win'] = rr_pts_for_game_win
-
-        if rr_pts_for_game_tie is not None:
-            if not (isinstance(rr_pts_for_game_tie, int) or isinstance(rr_pts_for_game_tie, float)):
-                raise BadArgument('Parameter `hold_third_place_match` must be of type int or float')
-            else:
-                rr_pts_for_game_tie = round(float(rr_pts_for_game_tie), 1)
-                data['rr_pts_for_game_tie'] = rr_pts_for_game_tie
-
-        if pts_for_bye is not None:
-            if not (isinstance(pts_for_bye, int) or isinstance(pts_for_bye, float)):
-                raise BadArgument('Parameter `pts_for_bye` must be of type int or float')
-            else:
-                pts_for_bye = round(float(pts_for_bye), 1)
-                data['pts_for_bye'] = pts_for_bye
-
-        if swiss_rounds is not None:
-            if not isinstance(swiss_rounds, int):
-                raise BadArgument('Parameter `swiss_rounds` must be of type int')
-            else:
-                data['swiss_rounds'] = swiss_rounds
+        if len(data.keys()) == 0:
+            raise UserInputError()
 
-        if ranked_by is not None:
-            if not isinstance(ranked_by, TournamentRankedBy):
-                try:
-                    ranked_by = TournamentRankedBy(ranked_by)
-                except:
-                    raise BadArgument(f"Parameter `ranked_by` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(TournamentRankedBy)])}")
-                else:
-                    data['ranked_by'] = ranked_by
+        if self._pending is not None:
+            self._pending.update(data)
+            return
+        self._put(data)
+
+    # Defers every `update` made inside the block and sends them as one
+    # request when it exits, later values winning. Each update is still
+    # validated when it is made; the local object changes once the request
+    # succeeds. Nothing is sent if the block raises. Nested blocks are sent
+    # with the outermost one.
+    @contextlib.contextmanager
+    def deferred(self):
+        outermost = self._pending is None
+        if outermost:
+            self._pending = {}
+        try:
+            yield self
+            if outermost:
+                self.flush()
+        finally:
+            if outermost:
+                self._pending = None
+
+    # Sends the updates deferred so far, if any, without leaving `deferred`.
+    def flush(self):
+        data = self._take_pending()
+        if data:
+            try:
+                self._put(data)
+            except BaseException:
+                self._restore_pending(data)
+                raise
+
+    # Sends an update and mirrors it locally once it succeeds.
+    def _put(self, data):
+        return self.http.request('PUT', f"tournaments/{self.id}.json", _prepare_params(data, 'tournament'), self._api_paths(),
+            hydrate = lambda tournament_data: self._apply_update(data))
+
+    def _take_pending(self):
+        data = self._pending
+        if data:
+            self._pending = {}
+        return data
+
+    # Puts back updates that failed to send, under any made since.
+    def _restore_pending(self, data):
+        if self._pending is not None:
+            self._pending = {**data, **self._pending}
+
+    # Mirrors a successful update onto the local object.
+    def _apply_update(self, data):
+        for i in data.keys():
+            if i == 'url':
+                setattr(self, i, "https://challonge.com/" + data[i])
             else:
-                data['ranked_by'] = ranked_by
+                setattr(self, i, data[i])
 
-        if accept_attachments is not None:
-            if not isinstance(accept_attachments, bool):
-                raise BadArgument('Parameter `accept_attachments` must be of type bool')
-            else:
-                data['accept_attachments'] = accept_attachments
+# A Tournament whose actions are awaitable. Created by `AsyncChallonge`.
+class AsyncTournament(Tournament):
+    __slots__ = ()
 
-        if hide_forum is not None:
-            if not isinstance(hide_forum, bool):
-                raise BadArgument('Parameter `hide_forum` must be of type bool')
-            else:
-                data['hide_forum'] = hide_forum
+    _matches_class = AsyncMatches
+    _participants_class = AsyncParticipants
 
-        if show_rounds is not None:
-            if not isinstance(show_rounds, bool):
-                raise BadArgument('Parameter `show_rounds` must be of type bool')
-            else:
-                data['show_rounds'] = show_rounds
+    async def abort_check_in(self, include_participants = False, include_matches = False):
+        return await self._action('abort_check_in', include_participants, include_matches)
 
-        if private is not None:
-            if not isinstance(private, bool):
-                raise BadArgument('Parameter `private` must be of type bool')
-            else:
-                data['private'] = private
+    async def delete(self):
+        await self.http.request('DELETE', f"tournaments/{self.id}.json", invalidates = self._api_paths())
 
-        if notify_users_when_matches_open is not None:
-            if not isinstance(notify_users_when_matches_open, bool):
-                raise BadArgument('Parameter `notify_users_when_matches_open` must be of type bool')
-            else:
-                data['notify_users_when_matches_open'] = notify_users_when_matches_open
+    async def finalize(self, include_participants = False, include_matches = False):
+        return await self._action('finalize', include_participants, include_matches)
 
-        if notify_users_when_the_tournament_ends is not None:
-            if not isinstance(notify_users_when_the_tournament_ends, bool):
-                raise BadArgument('Parameter `notify_users_when_the_tournament_ends` must be of type bool')
-            else:
-                data['notify_users_when_the_tournament_ends'] = notify_users_when_the_tournament_ends
+    async def open_for_predictions(self, include_participants = False, include_matches = False):
+        return await self._action('open_for_predictions', include_participants, include_matches)
 
-        if sequential_pairings is not None:
-            if not isinstance(sequential_pairings, bool):
-                raise BadArgument('Parameter `sequential_pairings` must be of type bool')
-            else:
-                data['sequential_pairings'] = sequential_pairings
+    async def process_check_ins(self, include_participants = False, include_matches = False):
+        return await self._action('process_check_ins', include_participants, include_matches)
 
-        if signup_cap is not None:
-            if isinstance(signup_cap, int):
-                raise BadArgument('Parameter `signup_cap` must be of type int')
-            elif signup_cap > 256 or signup_cap < 1:
-                raise BadArgument('Parameter `signup_cap` must be between the values 1 and 256')
-            else:
-                data['signup_cap'] = signup_cap
+    async def reset(self, include_participants = False, include_matches = False):
+        return await self._action('reset', include_participants, include_matches)
 
-        if check_in_duration is not None:
-            if not isinstance(check_in_duration, int):
-                raise BadArgument('Parameter `check_in_duration` must be of type int')
-            else:
-                data['check_in_duration'] = check_in_duration
+    async def start(self, include_participants = False, include_matches = False):
+        return await self._action('start', include_participants, include_matches)
 
-        if grand_finals_modifier is not None:
-            if not isinstance(grand_finals_modifier, TournamentGrandFinalModifier):
-                try:
-                    grand_finals_modifier = TournamentGrandFinalModifier(grand_finals_modifier)
-                except:
-                    raise BadArgument(f"Parameter `grand_finals_modifier` is invalid, valid Types: {', '.join(['`{}`'.format(i.value) for i in list(TournamentGrandFinalModifier)])}")
-                else:
-                    data['grand_finals_modifier'] = grand_finals_modifier
-            else:
-                data['grand_finals_modifier'] = grand_finals_modifier
+    # Accepts the same arguments as `Tournament.update`.
+    async def update(self, *args, **kwargs):
+        data = _tournament_settings(*args, **kwargs)
+        if len(data.keys()) == 0:
+            raise UserInputError()
 
-        if len(data.keys()) > 0:
-            url_params = '?' + urlencode(_prepare_params(data, 'tournament'))
+        if self._pending is not None:
+            self._pending.update(data)
+            return
+        await self._put(data)
+
+    # See `Tournament.deferred`.
+    @contextlib.asynccontextmanager
+    async def deferred(self):
+        outermost = self._pending is None
+        if outermost:
+            self._pending = {}
+        try:
+            yield self
+            if outermost:
+                await self.flush()
+        finally:
+            if outermost:
+                self._pending = None
+
+    async def flush(self):
+        data = self._take_pending()
+        if data:
+            try:
+                await self._put(data)
+            except BaseException:
+                self._restore_pending(data)
+                raise
 
-            req = requests.put(req_url + url_params, auth = self.auth_info)
-            if not req.status_code == 200:
-                try:
-                    errors = req.json()
-                    raise HTTPException(f"{req.status_code} - {errors['errors'][0]}")
-                except:
-                    raise HTTPException(req.status_code)
-            else:
-                for i in data.keys():
-                    if i == 'url':
-                        setattr(self, i, "https://challonge.com/" + data[i])
-                    else:
-                        setattr(self, i, data[i])
-        else:
-            raise UserInputError()
+_FIELDS = model_fields(Tournament)
+_dehydrate = compile_dehydrator(_FIELDS)